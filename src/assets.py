@@ -0,0 +1,199 @@
+import fcntl
+import json
+import os
+import time
+
+from fileio import file_state, remove_output
+
+STATIC_MANIFEST_VERSION = 1
+FICLONE = 0x40049409
+FINGERPRINT_LENGTH = 10
+
+
+class SyncStats():
+    def __init__(self):
+        self.copied = 0
+        self.skipped = 0
+        self.deleted = 0
+        self.bytes_copied = 0
+        self.bytes_skipped = 0
+        self.methods = {}
+        self.total_time = 0.0
+
+    def __repr__(self):
+        methods = ", ".join(f"{count} {method}" for method, count in sorted(self.methods.items()))
+        return (
+            f"copied {self.copied} assets ({self.bytes_copied} bytes{', ' + methods if methods else ''}), "
+            f"skipped {self.skipped} ({self.bytes_skipped} bytes), deleted {self.deleted} "
+            f"in {self.total_time:.3f}s"
+        )
+
+
+def find_assets(static_dir):
+    assets = []
+    for root, dirs, names in os.walk(static_dir):
+        dirs.sort()
+        prefix = os.path.relpath(root, static_dir)
+        prefix = "" if prefix == "." else prefix + os.sep
+        assets.extend(prefix + name for name in sorted(names))
+    return assets
+
+
+def fingerprinted_path(asset, source_hash):
+    # "css/styles.css" -> "css/styles.1a2b3c4d5e.css"
+    base, ext = os.path.splitext(asset)
+    return f"{base}.{source_hash[:FINGERPRINT_LENGTH]}{ext}"
+
+
+def clone_file(src, dst):
+    # Reflink (btrfs, XFS) first, then copy_file_range so the kernel copies
+    # without going through userspace, then a plain byte copy.
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return "reflinked"
+        except OSError:
+            pass
+        if hasattr(os, "copy_file_range"):
+            try:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return "copy_file_range"
+            except OSError:
+                pass
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+        import shutil
+
+        shutil.copyfileobj(fsrc, fdst, 1 << 20)
+        return "copied"
+
+
+def copy_asset(src, dst, link=False):
+    # The destination is always unlinked first: with hard links, writing into
+    # an existing output would otherwise write through to the source.
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    if os.path.lexists(dst):
+        os.remove(dst)
+    if link:
+        try:
+            os.link(src, dst)
+            return "linked"
+        except OSError:
+            pass
+    return clone_file(src, dst)
+
+
+def load_static_manifest(manifest_path):
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if manifest.get("version") != STATIC_MANIFEST_VERSION:
+        return {}
+    return manifest["files"]
+
+
+def save_static_manifest(manifest_path, files):
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    with open(manifest_path, "w") as f:
+        json.dump({"version": STATIC_MANIFEST_VERSION, "files": files}, f, sort_keys=True)
+
+
+def output_matches(path, size):
+    try:
+        return os.stat(path).st_size == size
+    except FileNotFoundError:
+        return False
+
+
+def copy_assets(jobs, workers, link, stats):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def run(job):
+        return copy_asset(job[0], job[1], link)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for job, method in zip(jobs, executor.map(run, jobs)):
+            stats.copied += 1
+            stats.bytes_copied += job[2]
+            stats.methods[method] = stats.methods.get(method, 0) + 1
+
+
+def plan_static(static_dir, previous, fingerprint=False, force=False):
+    # asset -> manifest entry, with the output path it is synced to. Forcing
+    # rehashes every asset instead of trusting size and mtime.
+    files = {}
+    for asset in find_assets(static_dir) if os.path.isdir(static_dir) else []:
+        old = None if force else previous.get(asset)
+        size, mtime_ns, source_hash = file_state(
+            os.path.join(static_dir, asset), None if old is None else (old["size"], old["mtime_ns"], old["source"]),
+        )
+        output = fingerprinted_path(asset, source_hash) if fingerprint else asset
+        files[asset] = {"source": source_hash, "size": size, "mtime_ns": mtime_ns, "output": output}
+    return files
+
+
+def output_map(files):
+    # "css/styles.css" -> "css/styles.1a2b3c4d5e.css", with "/" separators.
+    return {asset.replace(os.sep, "/"): entry["output"].replace(os.sep, "/") for asset, entry in files.items()}
+
+
+def static_outputs(static_dir, manifest_path):
+    # The fingerprinted names a sync would produce, without copying anything;
+    # templates reference them through {{ asset:<path> }} slots.
+    return output_map(plan_static(static_dir, load_static_manifest(manifest_path), fingerprint=True))
+
+
+def sync_static(static_dir, dest_dir, manifest_path, force=False, workers=4, link=False, fingerprint=False):
+    # Mirrors static_dir into dest_dir, copying only assets whose content
+    # changed since the last sync (or whose output went missing). With
+    # fingerprint=True outputs are named after their content hash and
+    # dest_dir/assets.json maps each asset to its fingerprinted path. Forcing
+    # recopies everything but still cleans up after the previous sync.
+    stats = SyncStats()
+    start = time.perf_counter()
+    previous = load_static_manifest(manifest_path)
+    files = plan_static(static_dir, previous, fingerprint, force)
+    jobs = []
+    for asset, entry in files.items():
+        old = previous.get(asset)
+        if (
+            not force
+            and old is not None
+            and old["source"] == entry["source"]
+            and old["output"] == entry["output"]
+            and output_matches(os.path.join(dest_dir, entry["output"]), entry["size"])
+        ):
+            stats.skipped += 1
+            stats.bytes_skipped += entry["size"]
+        else:
+            jobs.append((os.path.join(static_dir, asset), os.path.join(dest_dir, entry["output"]), entry["size"]))
+
+    # Remove outputs of deleted assets and stale fingerprinted names.
+    outputs = {entry["output"] for entry in files.values()}
+    for asset, old in previous.items():
+        if old["output"] not in outputs:
+            remove_output(dest_dir, old["output"])
+            stats.deleted += 1
+
+    if jobs:
+        copy_assets(jobs, workers, link, stats)
+
+    if fingerprint:
+        os.makedirs(dest_dir, exist_ok=True)
+        with open(os.path.join(dest_dir, "assets.json"), "w") as f:
+            json.dump(output_map(files), f, indent=2, sort_keys=True)
+    else:
+        remove_output(dest_dir, "assets.json")
+    if files != previous:
+        save_static_manifest(manifest_path, files)
+    stats.total_time = time.perf_counter() - start
+    return stats
@@ -0,0 +1,787 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from textnode import TextNode, TextType, text_node_to_html_node, text_nodes_to_html, text_nodes_to_html_nodes
+from htmlnode import FrozenProps, LeafNode, ParentNode, escape_text
+from build import Manifest, build_site, load_manifest, save_manifest
+from cache import LRUCache
+from helpers import (
+    extract_markdown_images, extract_markdown_links, markdown_to_blocks,
+    split_nodes_delimiter, split_nodes_image, split_nodes_link, split_nodes_link_and_image,
+    text_to_textnodes,
+)
+from blocks import iter_html_nodes, markdown_to_html_node
+from template import Template
+from corpus import BLOCK_MIX, INLINE_MIX, generate_corpus, parse_mix
+
+RESULTS_DIR = ".cache/bench"
+
+
+def chained_text_to_textnodes(text):
+    # The original five-pass pipeline, kept here as the "before" baseline.
+    node_list = split_nodes_link([TextNode(text, TextType.TEXT)])
+    node_list = split_nodes_image(node_list)
+    node_list = split_nodes_delimiter(node_list, "`", TextType.CODE)
+    node_list = split_nodes_delimiter(node_list, "_", TextType.ITALIC)
+    node_list = split_nodes_delimiter(node_list, "**", TextType.BOLD)
+    return node_list
+
+
+def inline_sample(i):
+    return (
+        f"Sentence {i} has **bold words**, some _italic text_, `inline code`, "
+        f"a [link](https://example.com/page/{i}) and an "
+        f"![image](https://example.com/img/{i}.png) in it. "
+    )
+
+
+def best_time(func, arg, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def bench_inline(args, sizes=(100, 1000, 5000)):
+    rows = []
+    print(f"{'segments':>10} {'chars':>10} {'chained s':>12} {'scanner s':>12} {'speedup':>8}")
+    for size in sizes:
+        text = "".join(inline_sample(i) for i in range(size))
+        before = best_time(chained_text_to_textnodes, text)
+        after = best_time(text_to_textnodes, text)
+        print(f"{size:>10} {len(text):>10} {before:>12.4f} {after:>12.4f} {before / after:>7.1f}x")
+        rows.append({"segments": size, "chars": len(text), "chained_seconds": before, "scanner_seconds": after})
+    return rows
+
+
+class DictTextNode():
+    # TextNode as it was laid out before __slots__, for comparison.
+    def __init__(self, text, text_type, url = None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictLeafNode():
+    def __init__(self, tag, value, props = None):
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+
+
+def allocated_bytes(build, items):
+    tracemalloc.start()
+    nodes = [build(*item) for item in items]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, len(nodes)
+
+
+def bench_memory(args, size=20000):
+    rows = []
+    text = "".join(inline_sample(i) for i in range(size))
+    text_nodes = text_to_textnodes(text)
+    text_items = [(node.text, node.text_type, node.url) for node in text_nodes]
+    leaf_items = [("b", node.text, None) for node in text_nodes]
+    print(f"{len(text_items)} nodes from a {len(text) / 1e6:.1f} MB document")
+    print(f"{'class':>14} {'before B/node':>14} {'after B/node':>13} {'before MB':>10} {'after MB':>9}")
+    for name, before, after, items in [
+        ("TextNode", DictTextNode, TextNode, text_items),
+        ("LeafNode", DictLeafNode, LeafNode, leaf_items),
+    ]:
+        before_size, count = allocated_bytes(before, items)
+        after_size, _ = allocated_bytes(after, items)
+        print(
+            f"{name:>14} {before_size / count:>14.0f} {after_size / count:>13.0f} "
+            f"{before_size / 1e6:>10.1f} {after_size / 1e6:>9.1f}"
+        )
+        rows.append({"class": name, "nodes": count, "dict_bytes": before_size, "slots_bytes": after_size})
+    return rows
+
+
+def generate_page_markdown(i, paragraphs=40):
+    lines = [f"# Page {i}", ""]
+    for p in range(paragraphs):
+        lines.append(inline_sample(i * paragraphs + p) * 3)
+        lines.append("")
+    return "\n".join(lines)
+
+
+def write_site(root, pages):
+    content_dir = os.path.join(root, "content")
+    for i in range(pages):
+        path = os.path.join(content_dir, f"section{i % 20}", f"page{i}.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(generate_page_markdown(i))
+    template_path = os.path.join(root, "template.html")
+    with open(template_path, "w") as f:
+        f.write("<html><title>{{ Title }}</title><body>{{ Content }}</body></html>")
+    return content_dir, template_path
+
+
+def tree_digest(root):
+    digest = hashlib.sha256()
+    for dirpath, dirs, files in sorted(os.walk(root)):
+        for name in sorted(files):
+            path = os.path.join(dirpath, name)
+            digest.update(os.path.relpath(path, root).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def bench_workers(args, pages=2000, worker_counts=(1, 2, 4, 8)):
+    rows = []
+    with tempfile.TemporaryDirectory() as root:
+        content_dir, template_path = write_site(root, pages)
+        print(f"{pages} pages, {os.cpu_count()} cpus")
+        print(f"{'workers':>8} {'render s':>9} {'speedup':>8} {'identical':>10}")
+        baseline = None
+        for workers in worker_counts:
+            dest = os.path.join(root, f"public{workers}")
+            manifest = os.path.join(root, f"manifest{workers}.json")
+            stats = build_site(content_dir, template_path, dest, manifest, workers=workers)
+            digest = tree_digest(dest)
+            if baseline is None:
+                baseline = (stats.render_time, digest)
+            print(
+                f"{workers:>8} {stats.render_time:>9.3f} {baseline[0] / stats.render_time:>7.2f}x "
+                f"{str(digest == baseline[1]):>10}"
+            )
+            rows.append({"workers": workers, "render_seconds": stats.render_time, "identical": digest == baseline[1]})
+    return rows
+
+
+def evict_page_cache(root, drop_caches=False):
+    # Drops root's files from the page cache so the next build reads from
+    # disk; the files are flushed first. posix_fadvise only touches these
+    # files. With drop_caches=True the whole machine's page cache is dropped
+    # through /proc/sys/vm/drop_caches instead, which only works as root.
+    # Returns the method used.
+    os.sync()
+    if drop_caches:
+        try:
+            with open("/proc/sys/vm/drop_caches", "w") as f:
+                f.write("1")
+            return "drop_caches"
+        except OSError:
+            pass
+    if not hasattr(os, "posix_fadvise"):
+        return "none"
+    for dirpath, dirs, files in os.walk(root):
+        for name in files:
+            fd = os.open(os.path.join(dirpath, name), os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+    return "fadvise"
+
+
+def bench_io(args, pages=2000, thread_counts=(0, 2, 4, 8)):
+    # Serial builds on a cold page cache, with and without the threaded
+    # read-ahead/write-behind stage.
+    rows = []
+    with tempfile.TemporaryDirectory() as root:
+        content_dir, template_path = write_site(root, pages)
+        print(f"{pages} pages")
+        print(f"{'threads':>8} {'render s':>9} {'speedup':>8} {'identical':>10} {'eviction':>12}")
+        baseline = None
+        for threads in thread_counts:
+            dest = os.path.join(root, f"public{threads}")
+            manifest = os.path.join(root, f"manifest{threads}.json")
+            eviction = evict_page_cache(content_dir, args.drop_caches)
+            stats = build_site(content_dir, template_path, dest, manifest, io_threads=threads)
+            digest = tree_digest(dest)
+            if baseline is None:
+                baseline = (stats.render_time, digest)
+            print(
+                f"{threads:>8} {stats.render_time:>9.3f} {baseline[0] / stats.render_time:>7.2f}x "
+                f"{str(digest == baseline[1]):>10} {eviction:>12}"
+            )
+            rows.append({
+                "io_threads": threads, "render_seconds": stats.render_time,
+                "identical": digest == baseline[1], "eviction": eviction,
+            })
+    return rows
+
+
+def bench_inline_cache(args, pages=500, unique_paragraphs=10):
+    # Pages share a footer and a few repeated snippets, like a real site.
+    footer = "Copyright **Example Corp**. See the [terms](/terms) and _privacy_ pages."
+    markdown = []
+    for i in range(pages):
+        blocks = [inline_sample(i * unique_paragraphs + p) for p in range(unique_paragraphs)]
+        blocks += [footer, inline_sample(-1), inline_sample(-2)] * 3
+        markdown.append("\n\n".join(blocks))
+
+    def render(cache):
+        for page in markdown:
+            for node in iter_html_nodes(page, cache):
+                node.to_html()
+
+    uncached = best_time(render, None)
+    cache = LRUCache(max_entries=10000)
+    cold = best_time(render, cache, repeat=1)
+    cold_stats = repr(cache)
+    warm = best_time(render, cache, repeat=1)
+    print(f"uncached {uncached:.3f}s, cold cache {cold:.3f}s, warm cache {warm:.3f}s")
+    print(f"cold: {cold_stats}")
+    print(f"after warm: {cache}")
+    return {"uncached_seconds": uncached, "cold_seconds": cold, "warm_seconds": warm, "hits": cache.hits, "misses": cache.misses}
+
+
+def legacy_split_nodes_link(old_nodes):
+    # split_nodes_link before the combined scanner: findall, then a
+    # str.split on the rebuilt literal for every match.
+    new_nodes = []
+    for old_node in old_nodes:
+        if old_node.text_type != TextType.TEXT:
+            new_nodes.append(old_node)
+            continue
+        original_text = old_node.text
+        links = re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", original_text)
+        if len(links) == 0:
+            new_nodes.append(old_node)
+            continue
+        for link in links:
+            sections = original_text.split(f"[{link[0]}]({link[1]})", 1)
+            if sections[0] != "":
+                new_nodes.append(TextNode(sections[0], TextType.TEXT))
+            new_nodes.append(TextNode(link[0], TextType.LINK, link[1]))
+            original_text = sections[1]
+        if original_text != "":
+            new_nodes.append(TextNode(original_text, TextType.TEXT))
+    return new_nodes
+
+
+def legacy_split_nodes_image(old_nodes):
+    new_nodes = []
+    for old_node in old_nodes:
+        if old_node.text_type != TextType.TEXT:
+            new_nodes.append(old_node)
+            continue
+        original_text = old_node.text
+        images = re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", original_text)
+        if len(images) == 0:
+            new_nodes.append(old_node)
+            continue
+        for image in images:
+            sections = original_text.split(f"![{image[0]}]({image[1]})", 1)
+            if sections[0] != "":
+                new_nodes.append(TextNode(sections[0], TextType.TEXT))
+            new_nodes.append(TextNode(image[0], TextType.IMAGE, image[1]))
+            original_text = sections[1]
+        if original_text != "":
+            new_nodes.append(TextNode(original_text, TextType.TEXT))
+    return new_nodes
+
+
+def sitemap_text(links):
+    return "".join(f"[Page {i}](/section/{i % 50}/page{i}.html) ![icon](/icons/{i % 7}.png) " for i in range(links))
+
+
+def bench_links(args, sizes=(10000, 50000)):
+    rows = []
+    print(f"{'links':>8} {'chars':>9} {'legacy split s':>15} {'one-pass s':>11} {'speedup':>8} {'extract s':>10}")
+    for size in sizes:
+        text = sitemap_text(size)
+
+        def legacy(text):
+            return legacy_split_nodes_image(legacy_split_nodes_link([TextNode(text, TextType.TEXT)]))
+
+        def one_pass(text):
+            return split_nodes_link_and_image([TextNode(text, TextType.TEXT)])
+
+        def extract(text):
+            return extract_markdown_links(text), extract_markdown_images(text)
+
+        before = best_time(legacy, text, repeat=1)
+        after = best_time(one_pass, text)
+        extracted = best_time(extract, text)
+        print(f"{size:>8} {len(text):>9} {before:>15.3f} {after:>11.3f} {before / after:>7.0f}x {extracted:>10.3f}")
+        rows.append({"links": size, "chars": len(text), "legacy_seconds": before, "one_pass_seconds": after, "extract_seconds": extracted})
+    return rows
+
+
+class StageTimer():
+    def __init__(self, measure_memory=False):
+        self.measure_memory = measure_memory
+        self.results = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        record = {"nodes": 0}
+        if self.measure_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        yield record
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] - before if self.measure_memory else None
+        self.results[name] = (elapsed, record["nodes"], peak)
+
+
+def run_stages(markdown, measure_memory=False):
+    # Each stage keeps its output so the next one is timed on its own.
+    # Returns {stage: (seconds, nodes, peak bytes or None)}.
+    timer = StageTimer(measure_memory)
+    with timer.stage("markdown_to_blocks") as record:
+        blocks = markdown_to_blocks(markdown)
+        record["nodes"] = len(blocks)
+    with timer.stage("text_to_textnodes") as record:
+        text_nodes = [text_to_textnodes(block) for block in blocks]
+        record["nodes"] = sum(len(nodes) for nodes in text_nodes)
+    with timer.stage("text_node_to_html_node") as record:
+        html_nodes = [ParentNode("p", [text_node_to_html_node(node) for node in nodes]) for nodes in text_nodes]
+        record["nodes"] = sum(len(node.children) for node in html_nodes)
+    with timer.stage("to_html") as record:
+        for node in html_nodes:
+            node.to_html()
+        record["nodes"] = len(html_nodes)
+    return timer.results
+
+
+def bench_pipeline(args):
+    markdown = generate_corpus(args.size, args.blocks, args.inline, args.seed)
+    megabytes = len(markdown.encode()) / 1e6
+    print(f"corpus: {megabytes:.2f} MB, seed {args.seed}, best of {args.repeat}")
+
+    best = {}
+    for _ in range(args.repeat):
+        for name, result in run_stages(markdown).items():
+            if name not in best or result[0] < best[name][0]:
+                best[name] = result
+    peaks = {}
+    if args.memory:
+        tracemalloc.start()
+        peaks = {name: result[2] for name, result in run_stages(markdown, measure_memory=True).items()}
+        tracemalloc.stop()
+
+    stages = {}
+    print(f"{'stage':>24} {'seconds':>9} {'MB/s':>8} {'nodes':>9} {'nodes/s':>11} {'peak MB':>8}")
+    for name, (seconds, nodes, _) in best.items():
+        stages[name] = {
+            "seconds": seconds,
+            "mb_per_s": megabytes / seconds,
+            "nodes": nodes,
+            "nodes_per_s": nodes / seconds,
+            "peak_bytes": peaks.get(name),
+        }
+        peak = f"{peaks[name] / 1e6:>8.1f}" if name in peaks else f"{'-':>8}"
+        print(f"{name:>24} {seconds:>9.4f} {megabytes / seconds:>8.2f} {nodes:>9} {nodes / seconds:>11.0f} {peak}")
+    total = sum(stage["seconds"] for stage in stages.values())
+    print(f"{'total':>24} {total:>9.4f} {megabytes / total:>8.2f}")
+    return {
+        "corpus": {"bytes": len(markdown.encode()), "seed": args.seed, "blocks": args.blocks, "inline": args.inline},
+        "stages": stages,
+        "total_seconds": total,
+    }
+
+
+def bench_blocks(args, sizes=(1_000_000, 2_000_000, 4_000_000, 8_000_000)):
+    # markdown_to_html_node end to end; time per KB should stay flat.
+    rows = []
+    print(f"{'MB':>6} {'blocks':>8} {'seconds':>9} {'us/KB':>8}")
+    for size in sizes:
+        markdown = generate_corpus(size, args.blocks, args.inline, args.seed)
+
+        def render(markdown):
+            return markdown_to_html_node(markdown).to_html()
+
+        seconds = best_time(render, markdown, repeat=args.repeat)
+        blocks = len(markdown_to_blocks(markdown))
+        per_kb = seconds * 1e6 / (len(markdown) / 1000)
+        print(f"{len(markdown) / 1e6:>6.1f} {blocks:>8} {seconds:>9.3f} {per_kb:>8.1f}")
+        rows.append({"bytes": len(markdown), "blocks": blocks, "seconds": seconds, "us_per_kb": per_kb})
+    return rows
+
+
+def recursive_iter_html(node):
+    # ParentNode.iter_html before the explicit-stack walk, for comparison.
+    if not isinstance(node, ParentNode):
+        yield from node.iter_html()
+        return
+    yield f"<{node.tag}>"
+    for child in node.children:
+        yield from recursive_iter_html(child)
+    yield f"</{node.tag}>"
+
+
+def bench_render(args):
+    tree = markdown_to_html_node(generate_corpus(args.size, args.blocks, args.inline, args.seed))
+    recursive = best_time(lambda tree: "".join(recursive_iter_html(tree)), tree, repeat=args.repeat)
+    iterative = best_time(lambda tree: tree.to_html(), tree, repeat=args.repeat)
+    print(f"{args.size / 1e6:.1f} MB page: recursive {recursive:.4f}s, explicit stack {iterative:.4f}s")
+    depth_row = {}
+    for depth in (1000, 10000, 100000):
+        node = LeafNode("b", "x")
+        for _ in range(depth):
+            node = ParentNode("div", [node])
+        seconds = best_time(lambda node: node.to_html(), node, repeat=1)
+        print(f"depth {depth:>6}: {seconds:.4f}s")
+        depth_row[depth] = seconds
+    return {"recursive_seconds": recursive, "iterative_seconds": iterative, "depth_seconds": depth_row}
+
+
+def bench_template(args, pages=10000):
+    # Templating overhead per page for a 10k-page build: the old chained
+    # str.replace against the precompiled template, with content fixed so
+    # only the layout work is measured.
+    with open("template.html") as f:
+        layout = f.read()
+    template = Template(layout)
+    nav = "<nav><ul>" + "".join(f'<li><a href="/section{i}/">Section {i}</a></li>' for i in range(20)) + "</ul></nav>"
+    content = markdown_to_html_node(generate_corpus(4000, args.blocks, args.inline, args.seed)).to_html()
+    values = [{"Title": f"Page {i}", "Nav": nav, "Path": f"/page{i}.html", "Content": content} for i in range(pages)]
+
+    def replace(values):
+        for page in values:
+            html = layout
+            for slot, value in page.items():
+                html = html.replace("{{ " + slot + " }}", value)
+
+    def render(values):
+        for page in values:
+            template.render(page)
+
+    def write(values):
+        for page in values:
+            template.write(io.StringIO(), page)
+
+    rows = {}
+    for name, func in (("str.replace", replace), ("render", render), ("write", write)):
+        seconds = best_time(func, values, repeat=args.repeat)
+        rows[name] = {"seconds": seconds, "us_per_page": seconds * 1e6 / pages}
+        print(f"{name:>12} {seconds:>8.4f}s {rows[name]['us_per_page']:>8.2f} us/page")
+    return rows
+
+
+@contextlib.contextmanager
+def escaping_disabled():
+    # Swaps the escapers for identity functions to get a no-escaping baseline.
+    import htmlnode
+
+    saved = htmlnode.escape_text, htmlnode.escape_attr
+    htmlnode.escape_text = htmlnode.escape_attr = lambda text: text
+    try:
+        yield
+    finally:
+        htmlnode.escape_text, htmlnode.escape_attr = saved
+
+
+def bench_escape(args):
+    # What escaping adds to rendering a typical page, plus the props and
+    # large-text cases on their own.
+    markdown = generate_corpus(args.size, args.blocks, args.inline, args.seed)
+    tree = markdown_to_html_node(markdown)
+
+    def pipeline(markdown):
+        return markdown_to_html_node(markdown).to_html()
+
+    escaped = best_time(lambda tree: tree.to_html(), tree, repeat=args.repeat)
+    escaped_pipeline = best_time(pipeline, markdown, repeat=args.repeat)
+    with escaping_disabled():
+        raw = best_time(lambda tree: tree.to_html(), tree, repeat=args.repeat)
+        raw_pipeline = best_time(pipeline, markdown, repeat=args.repeat)
+    print(f"to_html:     unescaped {raw:.4f}s, escaped {escaped:.4f}s ({(escaped - raw) * 100 / raw:+.1f}%)")
+    print(
+        f"md -> html:  unescaped {raw_pipeline:.4f}s, escaped {escaped_pipeline:.4f}s "
+        f"({(escaped_pipeline - raw_pipeline) * 100 / raw_pipeline:+.1f}%)"
+    )
+
+    shared = FrozenProps({"class": "external", "rel": "noopener"})
+    plain = dict(shared)
+    frozen_props = best_time(lambda node: [node.props_to_html() for _ in range(100000)], LeafNode("a", "x", shared), repeat=args.repeat)
+    dict_props = best_time(lambda node: [node.props_to_html() for _ in range(100000)], LeafNode("a", "x", plain), repeat=args.repeat)
+    print(f"props_to_html x100k: dict {dict_props:.4f}s, FrozenProps {frozen_props:.4f}s")
+
+    large = {}
+    for name, text in (("1MB clean", "lorem ipsum " * 87000), ("1MB with <&>", "a < b && c > d " * 70000)):
+        seconds = best_time(escape_text, text, repeat=args.repeat)
+        large[name] = seconds
+        print(f"{name:>14}: {seconds * 1000:.3f} ms")
+    return {
+        "unescaped_seconds": raw, "escaped_seconds": escaped,
+        "unescaped_pipeline_seconds": raw_pipeline, "escaped_pipeline_seconds": escaped_pipeline,
+        "props_dict_seconds": dict_props, "props_frozen_seconds": frozen_props, "large_text_seconds": large,
+    }
+
+
+def bench_textnodes(args, nodes=1_000_000, batch=16, distinct_urls=100):
+    # Converting TextNodes one at a time through the match against the
+    # batched dispatch table, to LeafNodes and straight to HTML.
+    kinds = [
+        (TextType.TEXT, None), (TextType.BOLD, None), (TextType.TEXT, None), (TextType.ITALIC, None),
+        (TextType.CODE, None), (TextType.TEXT, None), (TextType.LINK, "/page/{}"), (TextType.IMAGE, "/img/{}.png"),
+    ]
+    text_nodes = []
+    for i in range(nodes):
+        text_type, url = kinds[i % len(kinds)]
+        text_nodes.append(TextNode(f"span {i % 1000} <x>", text_type, url and url.format(i % distinct_urls)))
+
+    # Batches are paragraph-sized, as the pipeline converts them; one list of
+    # a million LeafNodes spends more time in the garbage collector than the
+    # dispatch table saves.
+    batches = [text_nodes[i:i + batch] for i in range(0, nodes, batch)]
+
+    def per_node(batches):
+        return ["".join([text_node_to_html_node(node).to_html() for node in text_nodes]) for text_nodes in batches]
+
+    def batched_nodes(batches):
+        return ["".join([node.to_html() for node in text_nodes_to_html_nodes(text_nodes)]) for text_nodes in batches]
+
+    def fragments(batches):
+        return [text_nodes_to_html(text_nodes) for text_nodes in batches]
+
+    assert per_node(batches[:10]) == batched_nodes(batches[:10]) == fragments(batches[:10])
+    results = {}
+    for name, func in (("per-node", per_node), ("batched", batched_nodes), ("fragments", fragments)):
+        seconds = best_time(func, batches, repeat=args.repeat)
+        results[name] = seconds
+        print(f"{name:>10}: {seconds:.4f}s  {seconds * 1e9 / nodes:7.1f} ns/node  ({results['per-node'] / seconds:.2f}x)")
+    return {"nodes": nodes, "batch": batch, "seconds": results}
+
+
+def bench_manifest(args, pages=50000):
+    # Saving and loading the dependency graph for a large site, against the
+    # same records as a JSON object per page (the previous format).
+    digest = hashlib.sha256(b"template").hexdigest()
+    inputs = {"template.html": (digest, ()), "nav": (digest, ("index.md",))}
+    deps = tuple(sorted(inputs))
+    records = {
+        f"section{i % 50}/page{i}.md": (4000 + i, 1_700_000_000_000_000_000 + i, hashlib.sha256(str(i).encode()).hexdigest(), deps)
+        for i in range(pages)
+    }
+    rows = {}
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "manifest")
+        save = best_time(lambda manifest: save_manifest(path, manifest), Manifest(inputs, records), repeat=args.repeat)
+        load = best_time(load_manifest, path, repeat=args.repeat)
+        rows["marshal"] = {"save_seconds": save, "load_seconds": load, "bytes": os.path.getsize(path)}
+
+        json_path = os.path.join(root, "manifest.json")
+        entries = {
+            page: {"size": size, "mtime_ns": mtime_ns, "source": source, "template": digest, "nav": digest}
+            for page, (size, mtime_ns, source, _) in records.items()
+        }
+
+        def save_json(entries):
+            with open(json_path, "w") as f:
+                json.dump({"version": 1, "pages": entries}, f, sort_keys=True)
+
+        def load_json(path):
+            with open(path) as f:
+                return json.load(f)
+
+        save = best_time(save_json, entries, repeat=args.repeat)
+        load = best_time(load_json, json_path, repeat=args.repeat)
+        rows["json"] = {"save_seconds": save, "load_seconds": load, "bytes": os.path.getsize(json_path)}
+    for name, row in rows.items():
+        print(f"{name:>8}: load {row['load_seconds'] * 1000:7.1f} ms, save {row['save_seconds'] * 1000:7.1f} ms, {row['bytes'] / 1e6:.1f} MB")
+    return rows
+
+
+def bench_search(args, pages=2000):
+    # What the search index adds to a full build, an incremental rebuild
+    # after one page changes, and the index size against postings stored
+    # as plain [page, count] pairs.
+    from search import SearchIndex
+
+    with tempfile.TemporaryDirectory() as root:
+        content_dir, template_path = write_site(root, pages)
+        dest_dir = os.path.join(root, "public")
+        manifest_path = os.path.join(root, "manifest")
+        start = time.perf_counter()
+        build_site(content_dir, template_path, dest_dir, manifest_path, search_index=False)
+        without = time.perf_counter() - start
+        start = time.perf_counter()
+        stats = build_site(content_dir, template_path, dest_dir, manifest_path, force=True)
+        with_index = time.perf_counter() - start
+        full = stats.search
+        page_path = os.path.join(content_dir, "section3", "page3.md")
+        with open(page_path, "a") as f:
+            f.write("\nA newly added paragraph about zebras.\n")
+        incremental = build_site(content_dir, template_path, dest_dir, manifest_path).search
+
+        index = SearchIndex.load(os.path.join(dest_dir, "search.json"))
+        plain = json.dumps(
+            {"pages": index.pages, "terms": {term: [list(p) for p in postings] for term, postings in index.terms.items()}},
+            ensure_ascii=False, separators=(",", ":"),
+        )
+        query = best_time(lambda queries: [index.search(q) for q in queries], ["bold words", "italic text", "zebras"], repeat=args.repeat)
+        assert index.search("zebras")[0][0] == "/section3/page3.html"
+    print(f"full build: {without:.3f}s without index, {with_index:.3f}s with ({(with_index - without) * 100 / without:+.1f}%)")
+    print(f"  {full}")
+    print(f"one page changed: {incremental}")
+    print(f"size: delta-encoded {full.bytes / 1e3:.1f} kB, plain postings {len(plain.encode()) / 1e3:.1f} kB")
+    print(f"3 queries: {query * 1000:.2f} ms")
+    return {
+        "build_seconds": without, "build_with_index_seconds": with_index,
+        "index_seconds": full.total_time, "incremental_index_seconds": incremental.total_time,
+        "index_bytes": full.bytes, "plain_bytes": len(plain.encode()), "query_seconds": query,
+    }
+
+
+NOOP_BUILD_TARGET_MS = 30
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def import_times(stderr):
+    # Top-level entries of `python -X importtime` output, as
+    # {module: cumulative microseconds}.
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def bench_startup(args, runs=10):
+    # Wall time of `main.py --help` and of a build with nothing to do,
+    # against a bare interpreter. Bytecode caching is forced on (into a
+    # temporary prefix) so the numbers match an installed tool.
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    with tempfile.TemporaryDirectory() as root:
+        write_site(root, 200)
+        os.makedirs(os.path.join(root, "static"))
+        python = [sys.executable, "-X", f"pycache_prefix={os.path.join(root, 'pycache')}"]
+
+        def run(argv, repeat=runs):
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                subprocess.run(python + argv, cwd=root, env=env, stdout=subprocess.DEVNULL, check=True)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            return best
+
+        run([MAIN_PATH], repeat=1)
+        rows = {
+            "python": run(["-c", "pass"]),
+            "help": run([MAIN_PATH, "--help"]),
+            "noop_build": run([MAIN_PATH]),
+        }
+        traced = subprocess.run(
+            python + ["-X", "importtime", MAIN_PATH], cwd=root, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True,
+        )
+    imports = import_times(traced.stderr)
+    overhead = (rows["noop_build"] - rows["python"]) * 1000
+    for name, seconds in rows.items():
+        print(f"{name:>12}: {seconds * 1000:6.1f} ms")
+    print(f"no-op build over bare python: {overhead:.1f} ms (target {NOOP_BUILD_TARGET_MS} ms): "
+          f"{'ok' if overhead <= NOOP_BUILD_TARGET_MS else 'MISSED'}")
+    slowest = sorted(imports.items(), key=lambda item: item[1], reverse=True)[:8]
+    print("slowest top-level imports: " + ", ".join(f"{name} {us / 1000:.1f} ms" for name, us in slowest))
+    return {"seconds": rows, "overhead_ms": overhead, "target_ms": NOOP_BUILD_TARGET_MS, "imports_us": imports}
+
+
+def compare_results(previous, current):
+    print(f"== compared with {previous['timestamp']}")
+    for bench, result in current["results"].items():
+        old = previous["results"].get(bench)
+        if bench != "pipeline" or not old:
+            continue
+        for name, stage in result["stages"].items():
+            if name not in old["stages"]:
+                continue
+            before = old["stages"][name]["seconds"]
+            change = (stage["seconds"] - before) * 100 / before
+            print(f"{name:>24} {before:>9.4f} -> {stage['seconds']:>9.4f} ({change:+.1f}%)")
+
+
+def parse_size(text):
+    units = {"KB": 1_000, "MB": 1_000_000, "GB": 1_000_000_000}
+    text = text.strip().upper()
+    for unit, factor in units.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+
+BENCHMARKS = {
+    "pipeline": bench_pipeline,
+    "inline": bench_inline,
+    "memory": bench_memory,
+    "workers": bench_workers,
+    "io": bench_io,
+    "inline-cache": bench_inline_cache,
+    "links": bench_links,
+    "blocks": bench_blocks,
+    "render": bench_render,
+    "template": bench_template,
+    "escape": bench_escape,
+    "textnodes": bench_textnodes,
+    "manifest": bench_manifest,
+    "search": bench_search,
+    "startup": bench_startup,
+}
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the markdown to HTML pipeline")
+    parser.add_argument("benchmarks", nargs="*", default=["pipeline"], help=f"any of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--size", type=parse_size, default=parse_size("2MB"), help="corpus size, e.g. 500KB or 20MB")
+    parser.add_argument("--blocks", type=parse_mix, default=BLOCK_MIX, help="block mix, e.g. paragraph=6,code=1")
+    parser.add_argument("--inline", type=parse_mix, default=INLINE_MIX, help="inline mix, e.g. plain=4,link=2")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="report the best of this many runs")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the tracemalloc pass")
+    parser.add_argument(
+        "--drop-caches", action="store_true",
+        help="io: drop the whole machine's page cache (root only) instead of evicting just the corpus files",
+    )
+    parser.add_argument("--json", help=f"results file (default {RESULTS_DIR}/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name} (choose from {', '.join(BENCHMARKS)})")
+
+    timestamp = time.strftime("%Y%m%dT%H%M%S")
+    report = {
+        "timestamp": timestamp,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {},
+    }
+    for name in args.benchmarks:
+        print(f"== {name}")
+        report["results"][name] = BENCHMARKS[name](args)
+    report["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    path = args.json or os.path.join(RESULTS_DIR, f"{timestamp}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"results written to {path}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare_results(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,119 @@
+import hashlib
+
+from htmlnode import LeafNode, ParentNode, RawNode
+from helpers import BlockType, heading_level, inline_to_html, iter_typed_blocks, slugify, text_to_children
+
+
+def inline_children(text, inline_cache=None):
+    if inline_cache is None:
+        return text_to_children(text)
+    return [RawNode(inline_to_html(text, inline_cache))]
+
+
+def paragraph_text(block):
+    return " ".join(block.split("\n"))
+
+
+def quote_text(block):
+    return " ".join(line.lstrip(">").strip() for line in block.split("\n"))
+
+
+def unordered_items(block):
+    return [line[2:] for line in block.split("\n")]
+
+
+def ordered_items(block):
+    # "2." is what is left of an empty last item once the block is stripped.
+    return [line.partition(".")[2][1:] for line in block.split("\n")]
+
+
+def inline_texts(block_type, block):
+    # The texts a block's inline markdown is parsed from, as rendered below;
+    # code blocks have none.
+    if block_type is BlockType.PARAGRAPH:
+        return [paragraph_text(block)]
+    if block_type is BlockType.HEADING:
+        return [block[heading_level(block) + 1:]]
+    if block_type is BlockType.QUOTE:
+        return [quote_text(block)]
+    if block_type is BlockType.UNORDERED_LIST:
+        return unordered_items(block)
+    if block_type is BlockType.ORDERED_LIST:
+        return ordered_items(block)
+    return []
+
+
+def paragraph_to_html_node(block, inline_cache=None):
+    return ParentNode("p", inline_children(paragraph_text(block), inline_cache))
+
+
+def heading_to_html_node(block, inline_cache=None):
+    level = heading_level(block)
+    text = block[level + 1:]
+    slug = slugify(text)
+    return ParentNode(f"h{level}", inline_children(text, inline_cache), {"id": slug} if slug else None)
+
+
+def code_to_html_node(block, inline_cache=None):
+    # Drop the opening fence line (and its info string) and the closing
+    # fence; the code itself is never parsed for inline markdown.
+    if "\n" not in block:
+        code = block[3:-3]
+    else:
+        lines = block.split("\n")[1:]
+        if lines and lines[-1].lstrip().startswith("```"):
+            lines.pop()
+        code = "\n".join(lines) + "\n"
+    return ParentNode("pre", [LeafNode("code", code)])
+
+
+def quote_to_html_node(block, inline_cache=None):
+    return ParentNode("blockquote", inline_children(quote_text(block), inline_cache))
+
+
+def unordered_list_to_html_node(block, inline_cache=None):
+    return ParentNode("ul", [ParentNode("li", inline_children(item, inline_cache)) for item in unordered_items(block)])
+
+
+def ordered_list_to_html_node(block, inline_cache=None):
+    return ParentNode("ol", [ParentNode("li", inline_children(item, inline_cache)) for item in ordered_items(block)])
+
+
+BLOCK_RENDERERS = {
+    BlockType.PARAGRAPH: paragraph_to_html_node,
+    BlockType.HEADING: heading_to_html_node,
+    BlockType.CODE: code_to_html_node,
+    BlockType.QUOTE: quote_to_html_node,
+    BlockType.UNORDERED_LIST: unordered_list_to_html_node,
+    BlockType.ORDERED_LIST: ordered_list_to_html_node,
+}
+
+
+def block_to_html_node(block_type, block, inline_cache=None):
+    return BLOCK_RENDERERS[block_type](block, inline_cache)
+
+
+def block_cache_key(block_type, block):
+    return f"{block_type.value}:{hashlib.sha1(block.encode()).hexdigest()}"
+
+
+def render_block(block_type, block, inline_cache=None, block_cache=None):
+    # With a block cache, unchanged blocks come back as their stored HTML
+    # and only new or edited blocks go through the inline pipeline.
+    if block_cache is None:
+        return block_to_html_node(block_type, block, inline_cache)
+    key = block_cache_key(block_type, block)
+    html = block_cache.get(key)
+    if html is None:
+        html = block_to_html_node(block_type, block, inline_cache).to_html()
+        block_cache.put(key, html)
+    return RawNode(html)
+
+
+def iter_html_nodes(source, inline_cache=None, block_cache=None):
+    for block_type, block in iter_typed_blocks(source):
+        yield render_block(block_type, block, inline_cache, block_cache)
+
+
+def markdown_to_html_node(markdown, inline_cache=None, block_cache=None):
+    return ParentNode("div", list(iter_html_nodes(markdown, inline_cache, block_cache)))
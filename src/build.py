@@ -0,0 +1,671 @@
+import io
+import marshal
+import os
+import time
+from itertools import repeat
+
+from fileio import Writer, atomic_write, file_state, prefetch, remove_output
+from htmlnode import escape_attr, escape_text
+from template import load_template
+
+# The markdown pipeline (blocks, helpers, links), profiling and process
+# pools are imported where they are used, so a build with nothing to
+# render never loads them.
+
+MANIFEST_VERSION = 3
+# Sources up to this size are read ahead and rendered in memory by the
+# overlapped I/O path; larger ones are streamed like a plain serial build.
+PREFETCH_MAX_BYTES = 256 * 1024
+SEARCH_INDEX = "search.json"
+
+
+class PageError(ValueError):
+    # A page that failed to render, named in the message. args stay plain
+    # strings so the error pickles back from worker processes.
+    def __init__(self, source_path, message):
+        super().__init__(source_path, message)
+        self.source_path = source_path
+        self.message = message
+
+    def __str__(self):
+        return f"{self.source_path}: {self.message}"
+
+
+class BuildStats():
+    def __init__(self):
+        self.rebuilt = 0
+        self.skipped = 0
+        self.deleted = 0
+        self.reasons = {}
+        self.search = None
+        self.scan_time = 0.0
+        self.render_time = 0.0
+        self.total_time = 0.0
+
+    def __repr__(self):
+        return (
+            f"rebuilt {self.rebuilt} pages, skipped {self.skipped}, deleted {self.deleted} "
+            f"in {self.total_time:.3f}s (scan {self.scan_time:.3f}s, render {self.render_time:.3f}s)"
+        )
+
+    def explain(self):
+        return "\n".join(f"  {page}: {reason}" for page, reason in sorted(self.reasons.items()))
+
+
+def extract_title(markdown):
+    if isinstance(markdown, str):
+        markdown = io.StringIO(markdown)
+    for line in markdown:
+        if line.startswith("# "):
+            return line[2:].strip()
+    raise ValueError("invalid markdown, no h1 header")
+
+
+def find_pages(content_dir):
+    # relpath once per directory, not per file: it dominated no-op builds.
+    pages = []
+    for root, dirs, files in os.walk(content_dir):
+        prefix = os.path.relpath(root, content_dir)
+        prefix = "" if prefix == "." else prefix + os.sep
+        pages.extend(prefix + name for name in files if name.endswith(".md"))
+    return sorted(pages)
+
+
+def parse_shard(text):
+    # "2/4" -> (2, 4): the second of four shards.
+    index, _, count = text.partition("/")
+    index, count = int(index), int(count)
+    if not 1 <= index <= count:
+        raise ValueError(f"shard {text} is not in 1/N..N/N")
+    return index, count
+
+
+def shard_of(page, count):
+    # A stable hash of the path (with "/" separators), so every machine
+    # partitions the site the same way however its pages are listed.
+    import zlib
+
+    return zlib.crc32(page.replace(os.sep, "/").encode()) % count + 1
+
+
+def output_path_for(page):
+    return page[:-len(".md")] + ".html"
+
+
+def url_for(output):
+    url = "/" + output.replace(os.sep, "/")
+    if url.endswith("/index.html"):
+        url = url[:-len("index.html")]
+    return url
+
+
+def nav_pages(pages):
+    # The top-level pages: files in the content root and the index page of
+    # each first-level directory.
+    top = []
+    for page in pages:
+        parts = page.split(os.sep)
+        if len(parts) == 1 or (len(parts) == 2 and parts[1] == "index.md"):
+            top.append(page)
+    return top
+
+
+def build_nav(content_dir, pages):
+    items = []
+    for page in nav_pages(pages):
+        source_path = os.path.join(content_dir, page)
+        try:
+            with open(source_path) as f:
+                title = extract_title(f)
+        except ValueError as e:
+            raise PageError(source_path, str(e)) from e
+        href = escape_attr(url_for(output_path_for(page)))
+        items.append(f'<li><a href="{href}">{escape_text(title)}</a></li>')
+    return f"<nav><ul>{''.join(items)}</ul></nav>"
+
+
+def write_content(src, inline_cache, block_cache, scan=None):
+    from blocks import render_block
+    from helpers import iter_typed_blocks
+
+    def write(out):
+        out.write("<div>")
+        for block_type, block in iter_typed_blocks(src):
+            if scan is not None:
+                scan.add(block_type, block)
+            render_block(block_type, block, inline_cache, block_cache).write_html(out)
+        out.write("</div>")
+    return write
+
+
+def generate_page(
+    source_path, template, dest_path, values=None, inline_cache=None, block_cache=None, profiler=None, scan=None,
+):
+    # Markdown is streamed block by block into the template's Content slot,
+    # so only the title needs a separate (early-exit) read of the source.
+    # The content is what markdown_to_html_node(markdown).to_html() would
+    # produce. With a PageScan, the page's title, links and terms are
+    # collected from the same blocks as they stream past. Invalid markdown
+    # raises PageError naming the source.
+    try:
+        if profiler is not None:
+            return generate_page_profiled(source_path, template, dest_path, values, inline_cache, block_cache, profiler, scan)
+        with open(source_path) as f:
+            title = extract_title(f)
+        if scan is not None:
+            scan.title = title
+        with open(source_path) as src, atomic_write(dest_path) as out:
+            content = write_content(src, inline_cache, block_cache, scan)
+            template.write(out, dict(values or {}, Title=escape_text(title), Content=content))
+    except PageError:
+        raise
+    except ValueError as e:
+        raise PageError(source_path, str(e)) from e
+
+
+def render_page(markdown, template, values=None, inline_cache=None, block_cache=None, scan=None):
+    # generate_page for a source that is already in memory; returns the page.
+    out = io.StringIO()
+    title = extract_title(markdown)
+    if scan is not None:
+        scan.title = title
+    content = write_content(markdown, inline_cache, block_cache, scan)
+    template.write(out, dict(values or {}, Title=escape_text(title), Content=content))
+    return out.getvalue()
+
+
+def generate_page_profiled(source_path, template, dest_path, values, inline_cache, block_cache, profiler, scan=None):
+    # Same output as generate_page, with every stage timed per page.
+    from blocks import render_block
+    from helpers import iter_typed_blocks
+
+    with profiler.page(source_path) as page:
+        with profiler.stage(page, "extract_title"):
+            with open(source_path) as f:
+                title = extract_title(f)
+        if scan is not None:
+            scan.title = title
+        title = escape_text(title)
+        content_time = 0.0
+
+        def write(out):
+            nonlocal content_time
+            content_start = time.perf_counter()
+            out.write("<div>")
+            blocks = iter_typed_blocks(src)
+            while True:
+                with profiler.stage(page, "markdown_to_blocks") as counts:
+                    typed_block = next(blocks, None)
+                    counts["nodes"] = 0 if typed_block is None else 1
+                if typed_block is None:
+                    break
+                if scan is not None:
+                    with profiler.stage(page, "scan_page") as counts:
+                        scan.add(*typed_block)
+                        counts["nodes"] = 1
+                with profiler.stage(page, "block_to_html_node") as counts:
+                    node = render_block(*typed_block, inline_cache, block_cache)
+                    counts["nodes"] = len(node.children) if node.children else 0
+                with profiler.stage(page, "write_html") as counts:
+                    node.write_html(out)
+                    counts["nodes"] = 1
+            out.write("</div>")
+            content_time = time.perf_counter() - content_start
+
+        with open(source_path) as src, atomic_write(dest_path) as out:
+            template_start = time.perf_counter()
+            template.write(out, dict(values or {}, Title=title, Content=write))
+            profiler.add(page, "template", time.perf_counter() - template_start - content_time)
+
+
+worker_inline_cache = None
+worker_block_cache = None
+worker_profile = None
+
+
+def init_worker(inline_cache, block_cache, profile):
+    global worker_inline_cache, worker_block_cache, worker_profile
+    worker_inline_cache = inline_cache
+    worker_block_cache = block_cache
+    worker_profile = profile
+    for cache in (inline_cache, block_cache):
+        if cache is not None:
+            cache.record_changes()
+
+
+def new_scan(scan_terms):
+    # scan_terms is None when pages are not scanned at all.
+    if scan_terms is None:
+        return None
+    from links import PageScan
+
+    return PageScan(scan_terms)
+
+
+def generate_page_in_worker(source_path, template, dest_path, values, scan_terms):
+    # Returns the page's profile (or None), what it added to each cache and
+    # its PageScan (or None).
+    profiler = None
+    if worker_profile is not None:
+        from profiling import Profiler
+
+        profiler = Profiler(trace_allocations=worker_profile)
+    scan = new_scan(scan_terms)
+    generate_page(source_path, template, dest_path, values, worker_inline_cache, worker_block_cache, profiler, scan)
+    changes = [None if cache is None else cache.changes() for cache in (worker_inline_cache, worker_block_cache)]
+    return None if profiler is None else profiler.pages, changes, scan
+
+
+def render_pages_overlapped(jobs, template, io_threads, queue_size, inline_cache=None, block_cache=None, scans=None, scan_terms=None):
+    # Sources are read ahead and finished pages written behind on threads,
+    # so disk I/O overlaps with parsing. Both queues are bounded and only
+    # pages under PREFETCH_MAX_BYTES go through them, so at most about
+    # 2 * queue_size small pages are in memory; a large page is streamed by
+    # generate_page.
+    with Writer(io_threads, queue_size) as writer:
+        jobs = prefetch(jobs, lambda job: job[0], io_threads, queue_size, PREFETCH_MAX_BYTES)
+        for (source_path, dest_path, values), markdown in jobs:
+            scan = new_scan(scan_terms)
+            if markdown is None:
+                generate_page(source_path, template, dest_path, values, inline_cache, block_cache, scan=scan)
+            else:
+                try:
+                    html = render_page(markdown, template, values, inline_cache, block_cache, scan)
+                except ValueError as e:
+                    raise PageError(source_path, str(e)) from e
+                writer.submit(dest_path, html)
+            if scan is not None:
+                scans[source_path] = scan
+
+
+def render_pages(
+    jobs, template, workers=1, chunksize=None, inline_cache=None, block_cache=None, profiler=None,
+    io_threads=0, queue_size=16, scans=None, scan_terms=False,
+):
+    # Each page renders independently into its own file, so spreading jobs
+    # over processes gives byte-identical output to the serial loop. Workers
+    # start from a copy of the caches; the entries they add and their hit
+    # and miss counts are sent back with their profiles and merged, so the
+    # caches persist and report as they would after a serial build. With a
+    # scans dict, each page's PageScan (with terms if scan_terms) is stored
+    # in it under the page's source path.
+    if not jobs:
+        return
+    if scans is None:
+        scan_terms = None
+    if (workers <= 1 or len(jobs) < 2) and io_threads > 0 and profiler is None:
+        render_pages_overlapped(jobs, template, io_threads, queue_size, inline_cache, block_cache, scans, scan_terms)
+        return
+    if workers <= 1 or len(jobs) < 2:
+        for source_path, dest_path, values in jobs:
+            scan = new_scan(scan_terms)
+            generate_page(source_path, template, dest_path, values, inline_cache, block_cache, profiler, scan)
+            if scan is not None:
+                scans[source_path] = scan
+        return
+    if chunksize is None:
+        chunksize = max(1, len(jobs) // (workers * 4))
+    sources = [job[0] for job in jobs]
+    dests = [job[1] for job in jobs]
+    values = [job[2] for job in jobs]
+    profile = None if profiler is None else profiler.trace_allocations
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(inline_cache, block_cache, profile)) as executor:
+        results = executor.map(
+            generate_page_in_worker, sources, repeat(template), dests, values, repeat(scan_terms), chunksize=chunksize,
+        )
+        for source_path, (pages, changes, scan) in zip(sources, results):
+            if scan is not None:
+                scans[source_path] = scan
+            if pages is not None:
+                profiler.merge(pages)
+            for cache, cache_changes in zip((inline_cache, block_cache), changes):
+                if cache is not None:
+                    cache.merge(cache_changes)
+
+
+class Manifest():
+    # The dependency graph of the last build. inputs maps everything pages
+    # read besides their own source (template files, the nav) to
+    # (fingerprint, what it was derived from, ...); pages maps each page to
+    # (size, mtime_ns, source hash, input keys it read). A shard build also
+    # records which (index, count) shard it covers.
+    def __init__(self, inputs=None, pages=None, shard=None):
+        self.inputs = inputs or {}
+        self.pages = pages or {}
+        self.shard = shard
+
+
+def load_manifest(manifest_path):
+    try:
+        # One read: marshal.load on a file object pulls it in small chunks.
+        with open(manifest_path, "rb") as f:
+            data = marshal.loads(f.read())
+    except (FileNotFoundError, EOFError, ValueError, TypeError):
+        return Manifest()
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return Manifest()
+    return Manifest(data["inputs"], data["pages"], data.get("shard"))
+
+
+def save_manifest(manifest_path, manifest):
+    # marshal rather than JSON: records are plain tuples, pages that read
+    # the same inputs share one key tuple (stored once), and a 50k-page
+    # graph loads in tens of milliseconds.
+    data = {"version": MANIFEST_VERSION, "inputs": manifest.inputs, "pages": manifest.pages}
+    if manifest.shard is not None:
+        data["shard"] = manifest.shard
+    with atomic_write(manifest_path, "wb") as f:
+        marshal.dump(data, f)
+
+
+def links_path(manifest_path):
+    return manifest_path + ".links"
+
+
+def search_path(manifest_path):
+    return manifest_path + ".search"
+
+
+def load_records(path):
+    # Per-page data kept apart from the graph so a no-op build never loads
+    # it: page -> (output, links, images, anchors) for links, page -> (url,
+    # title, term counts) for search.
+    try:
+        with open(path, "rb") as f:
+            data = marshal.loads(f.read())
+    except (FileNotFoundError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return None
+    return data["pages"]
+
+
+def save_records(path, pages):
+    with atomic_write(path, "wb") as f:
+        marshal.dump({"version": MANIFEST_VERSION, "pages": pages}, f)
+
+
+def load_links(manifest_path):
+    return load_records(links_path(manifest_path))
+
+
+def save_links(manifest_path, pages):
+    save_records(links_path(manifest_path), pages)
+
+
+def file_input(path, previous):
+    # (hash, derived from, (size, mtime_ns, hash)); see file_state.
+    state = file_state(path, previous[2] if previous is not None and len(previous) > 2 else None)
+    return (state[2], (), state)
+
+
+def explain_input(key, inputs, previous, changed_sources):
+    # Why an input changed, following what it was derived from.
+    derived_from = inputs[key][1]
+    old_from = previous.inputs.get(key, (None, ()))[1]
+    causes = sorted(set(derived_from) ^ set(old_from) | (set(derived_from) & changed_sources))
+    if not causes:
+        return f"{key} changed"
+    return f"{key} changed (via {', '.join(causes)})"
+
+
+def rebuild_reason(old, source_hash, deps, dest_path, inputs, previous, changed_sources, force):
+    if force:
+        return "forced"
+    if old is None:
+        return "new page"
+    if old[2] != source_hash:
+        return "source changed"
+    changed = [key for key in deps if inputs[key][0] != previous.inputs.get(key, (None,))[0]]
+    if changed:
+        return "; ".join(explain_input(key, inputs, previous, changed_sources) for key in changed)
+    if old[3] != deps:
+        return f"no longer reads {', '.join(sorted(set(old[3]) - set(deps)))}"
+    if not os.path.exists(dest_path):
+        return "output missing"
+    return None
+
+
+def asset_urls(template, assets):
+    # Slot -> URL for the template's {{ asset:<path> }} slots.
+    urls = {}
+    for slot in template.slots:
+        if slot.startswith("asset:"):
+            asset = slot[len("asset:"):]
+            urls[slot] = escape_attr("/" + (assets or {}).get(asset, asset))
+    return urls
+
+
+def build_site(
+    content_dir, template_path, dest_dir, manifest_path,
+    force=False, workers=1, chunksize=None, inline_cache=None, block_cache=None, profiler=None,
+    io_threads=0, shard=None, search_index=True, assets=None,
+):
+    # A page is rebuilt when its source or anything it read changed: the
+    # template and its partials, the nav if the template shows it, and the
+    # URLs of the static files it links through {{ asset:<path> }} slots
+    # (assets maps them to their fingerprinted names). The nav is itself
+    # derived from the top-level pages, so retitling one of them reaches
+    # every page through it. With shard=(index, count) only that shard's
+    # pages are built (see merge_shards); the nav still lists the whole site.
+    stats = BuildStats()
+    start = time.perf_counter()
+    previous = load_manifest(manifest_path)
+    template = load_template(template_path)
+    page_list = find_pages(content_dir)
+    inputs = {path: file_input(path, previous.inputs.get(path)) for path in template.dependencies}
+    nav = ""
+    if "Nav" in template.slots:
+        # The nav is small enough to be its own fingerprint.
+        nav = build_nav(content_dir, page_list)
+        inputs["nav"] = (nav, tuple(nav_pages(page_list)))
+    values = asset_urls(template, assets)
+    if values:
+        inputs["assets"] = (tuple(sorted(values.items())), ())
+    deps = tuple(sorted(inputs))
+    if shard is not None:
+        page_list = [page for page in page_list if shard_of(page, shard[1]) == shard[0]]
+
+    scan_start = time.perf_counter()
+    pages = {}
+    changed_sources = set()
+    for page in page_list:
+        source_path = os.path.join(content_dir, page)
+        old = previous.pages.get(page)
+        size, mtime_ns, source_hash = file_state(source_path, old)
+        if old is None or old[2] != source_hash:
+            changed_sources.add(page)
+        pages[page] = (size, mtime_ns, source_hash, deps)
+    stats.scan_time = time.perf_counter() - scan_start
+
+    jobs = []
+    for page, (size, mtime_ns, source_hash, deps) in pages.items():
+        output = output_path_for(page)
+        dest_path = os.path.join(dest_dir, output)
+        reason = rebuild_reason(
+            previous.pages.get(page), source_hash, deps, dest_path, inputs, previous, changed_sources, force,
+        )
+        if reason is None:
+            stats.skipped += 1
+            continue
+        stats.reasons[page] = reason
+        jobs.append((os.path.join(content_dir, page), dest_path, {**values, "Nav": nav, "Path": escape_attr(url_for(output))}))
+
+    render_start = time.perf_counter()
+    scans = {}
+    render_pages(
+        jobs, template, workers, chunksize, inline_cache, block_cache, profiler, io_threads,
+        scans=scans, scan_terms=search_index,
+    )
+    stats.render_time = time.perf_counter() - render_start
+    stats.rebuilt = len(jobs)
+
+    deleted = [page for page in previous.pages if page not in pages]
+    for page in deleted:
+        remove_output(dest_dir, output_path_for(page))
+        stats.deleted += 1
+
+    update_links(content_dir, manifest_path, pages, changed_sources, deleted, scans, search_index)
+    if search_index:
+        # A shard only records its pages' terms; merge writes the index.
+        index_path = None if shard is not None else os.path.join(dest_dir, SEARCH_INDEX)
+        stats.search = update_search(content_dir, index_path, manifest_path, pages, changed_sources, deleted, scans)
+    if inputs != previous.inputs or pages != previous.pages or shard != previous.shard:
+        save_manifest(manifest_path, Manifest(inputs, pages, shard))
+    stats.total_time = time.perf_counter() - start
+    return stats
+
+
+def page_scan(content_dir, page, scans, terms):
+    # The PageScan collected while rendering page, or, for a page this build
+    # did not render, one made by streaming its source once.
+    source_path = os.path.join(content_dir, page)
+    scan = scans.get(source_path)
+    if scan is None or (terms and scan.terms is None):
+        from links import scan_page
+
+        with open(source_path) as f:
+            title = extract_title(f)
+            f.seek(0)
+            scan = scan_page(f, terms)
+        scan.title = title
+        scans[source_path] = scan
+    return scan
+
+
+def update_links(content_dir, manifest_path, pages, changed_sources, deleted, scans, terms=False):
+    # Links and anchors feed the site-wide link index (links.py). Changed
+    # pages were just rendered, which collected them; the file is only
+    # touched when something changed or it went missing.
+    exists = os.path.exists(links_path(manifest_path))
+    if exists and not changed_sources and not deleted:
+        return
+    links = (load_links(manifest_path) if exists else None) or {}
+    for page in deleted:
+        links.pop(page, None)
+    for page in pages:
+        if page in changed_sources or page not in links:
+            scan = page_scan(content_dir, page, scans, terms)
+            links[page] = (output_path_for(page), scan.links, scan.images, scan.anchors)
+    save_links(manifest_path, links)
+
+
+def update_search(content_dir, index_path, manifest_path, pages, changed_sources, deleted, scans):
+    # Term counts of changed pages were collected while rendering them; the
+    # index is then rebuilt from the stored counts, which needs no markdown
+    # parsing. Like the links, nothing is loaded when nothing changed.
+    exists = os.path.exists(search_path(manifest_path))
+    if exists and not changed_sources and not deleted and (index_path is None or os.path.exists(index_path)):
+        return None
+    from search import IndexStats, write_index
+
+    stats = IndexStats()
+    start = time.perf_counter()
+    records = (load_records(search_path(manifest_path)) if exists else None) or {}
+    for page in deleted:
+        records.pop(page, None)
+    for page in pages:
+        if page in changed_sources or page not in records:
+            scan = page_scan(content_dir, page, scans, True)
+            records[page] = (url_for(output_path_for(page)), scan.title, scan.terms)
+            stats.indexed += 1
+    if stats.indexed or deleted or not exists:
+        save_records(search_path(manifest_path), records)
+    stats.pages = len(records)
+    if index_path is not None:
+        write_index(index_path, records, stats)
+    stats.total_time = time.perf_counter() - start
+    return stats
+
+
+class MergeStats():
+    def __init__(self):
+        self.shards = 0
+        self.pages = 0
+        self.copied = 0
+        self.deleted = 0
+        self.search = None
+        self.total_time = 0.0
+
+    def __repr__(self):
+        return (
+            f"merged {self.shards} shards ({self.pages} pages): copied {self.copied}, "
+            f"deleted {self.deleted} in {self.total_time:.3f}s"
+        )
+
+
+def fingerprints(inputs):
+    return {key: value[0] for key, value in inputs.items()}
+
+
+def merge_shards(shards, dest_dir, manifest_path):
+    # Combines the outputs and manifests of shard builds, given as
+    # (dest_dir, manifest_path) pairs, into dest_dir and one manifest as if
+    # a single build had produced them. Every shard of the same count must
+    # be present and built from the same inputs. Pages are only copied when
+    # their source or inputs changed since the last merge.
+    stats = MergeStats()
+    start = time.perf_counter()
+    manifests = []
+    for shard_dest, shard_manifest in shards:
+        manifest = load_manifest(shard_manifest)
+        if manifest.shard is None:
+            raise ValueError(f"not a shard build: {shard_manifest}")
+        manifests.append((shard_dest, shard_manifest, manifest))
+    if not manifests:
+        raise ValueError("no shards to merge")
+    count = manifests[0][2].shard[1]
+    found = sorted(manifest.shard for _, _, manifest in manifests)
+    if found != [(index, count) for index in range(1, count + 1)]:
+        raise ValueError(
+            f"expected shards 1/{count}..{count}/{count}, got {', '.join(f'{i}/{n}' for i, n in found)}"
+        )
+    inputs = manifests[0][2].inputs
+    for _, _, manifest in manifests:
+        if fingerprints(manifest.inputs) != fingerprints(inputs):
+            raise ValueError(f"shard {manifest.shard[0]}/{count} was built from different inputs")
+
+    previous = load_manifest(manifest_path)
+    inputs_changed = fingerprints(inputs) != fingerprints(previous.inputs)
+    pages = {}
+    links = {}
+    terms = {}
+    for shard_dest, shard_manifest, manifest in manifests:
+        for page, entry in manifest.pages.items():
+            output = output_path_for(page)
+            dest_path = os.path.join(dest_dir, output)
+            old = previous.pages.get(page)
+            # The output is a function of the source hash and the inputs it
+            # read; size and mtime differ between machines.
+            if inputs_changed or old is None or old[2:] != entry[2:] or not os.path.exists(dest_path):
+                with open(os.path.join(shard_dest, output), "rb") as f:
+                    html = f.read()
+                with atomic_write(dest_path, "wb") as f:
+                    f.write(html)
+                stats.copied += 1
+        pages.update(manifest.pages)
+        links.update(load_links(shard_manifest) or {})
+        terms.update(load_records(search_path(shard_manifest)) or {})
+    stats.shards = len(manifests)
+    stats.pages = len(pages)
+
+    for page in previous.pages:
+        if page not in pages:
+            remove_output(dest_dir, output_path_for(page))
+            stats.deleted += 1
+
+    save_links(manifest_path, links)
+    if terms:
+        from search import IndexStats, write_index
+
+        search_start = time.perf_counter()
+        stats.search = IndexStats()
+        stats.search.pages = len(terms)
+        save_records(search_path(manifest_path), terms)
+        write_index(os.path.join(dest_dir, SEARCH_INDEX), terms, stats.search)
+        stats.search.total_time = time.perf_counter() - search_start
+    save_manifest(manifest_path, Manifest(inputs, pages))
+    stats.total_time = time.perf_counter() - start
+    return stats
@@ -0,0 +1,101 @@
+import json
+import os
+from collections import OrderedDict
+
+CACHE_VERSION = 1
+
+
+class LRUCache():
+    # Bounded string -> string cache. Size is tracked as the UTF-8 length of
+    # key plus value, so max_bytes limits the payload, not Python overhead.
+    def __init__(self, max_entries=None, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.journal = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        lookups = self.hits + self.misses
+        rate = self.hits * 100 / lookups if lookups else 0.0
+        return (
+            f"{self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate), "
+            f"{self.evictions} evictions, {len(self.entries)} entries, {self.size} bytes"
+        )
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.journal is not None:
+            self.journal.append((key, value))
+        if key in self.entries:
+            self.size -= entry_size(key, self.entries.pop(key))
+        size = entry_size(key, value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self.entries[key] = value
+        self.size += size
+        while (
+            (self.max_entries is not None and len(self.entries) > self.max_entries)
+            or (self.max_bytes is not None and self.size > self.max_bytes)
+        ):
+            old_key, old_value = self.entries.popitem(last=False)
+            self.size -= entry_size(old_key, old_value)
+            self.evictions += 1
+
+    def record_changes(self):
+        # Used by a build worker on its copy of the cache: from here on,
+        # changes() returns what was added and looked up since its last call.
+        self.journal = []
+        self.reported = (self.hits, self.misses)
+
+    def changes(self):
+        journal, self.journal = self.journal, []
+        hits, misses = self.reported
+        self.reported = (self.hits, self.misses)
+        return journal, self.hits - hits, self.misses - misses
+
+    def merge(self, changes):
+        # Folds a worker's changes() into this cache. Evictions are counted
+        # as the entries are put here, against this cache's own limits.
+        entries, hits, misses = changes
+        for key, value in entries:
+            self.put(key, value)
+        self.hits += hits
+        self.misses += misses
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "entries": list(self.entries.items())}, f)
+
+    def load(self, path):
+        # Entries are stored oldest first, so replaying them through put()
+        # restores the recency order and re-applies the current limits.
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if data.get("version") != CACHE_VERSION:
+            return
+        for key, value in data["entries"]:
+            self.put(key, value)
+        self.evictions = 0
+
+
+def entry_size(key, value):
+    return len(key.encode()) + len(value.encode())
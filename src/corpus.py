@@ -0,0 +1,159 @@
+import random
+
+BLOCK_MIX = {"paragraph": 6, "heading": 1, "list": 2, "ordered_list": 1, "quote": 1, "code": 1}
+INLINE_MIX = {"plain": 6, "bold": 1, "italic": 1, "code": 1, "link": 1, "image": 1}
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud"
+).split()
+
+
+def parse_mix(text):
+    # "paragraph=6,heading=1" -> {"paragraph": 6, "heading": 1}
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight) if weight else 1.0
+    return mix
+
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def inline_span(rng, kind):
+    match kind:
+        case "plain":
+            return words(rng, rng.randint(3, 10))
+        case "bold":
+            return f"**{words(rng, rng.randint(1, 3))}**"
+        case "italic":
+            return f"_{words(rng, rng.randint(1, 3))}_"
+        case "code":
+            return f"`{rng.choice(WORDS)}({rng.randint(0, 99)})`"
+        case "link":
+            return f"[{words(rng, 2)}](https://example.com/{rng.choice(WORDS)}/{rng.randint(0, 9999)})"
+        case "image":
+            return f"![{words(rng, 2)}](/images/{rng.randint(0, 999)}.png)"
+        case _:
+            raise ValueError(f"unknown inline feature: {kind}")
+
+
+def inline_text(rng, inline_mix, spans):
+    kinds = rng.choices(list(inline_mix), weights=list(inline_mix.values()), k=spans)
+    return " ".join(inline_span(rng, kind) for kind in kinds)
+
+
+def generate_block(rng, kind, inline_mix):
+    match kind:
+        case "paragraph":
+            lines = rng.randint(1, 4)
+            return "\n".join(inline_text(rng, inline_mix, rng.randint(3, 8)) for _ in range(lines))
+        case "heading":
+            return "#" * rng.randint(1, 6) + " " + words(rng, rng.randint(2, 6))
+        case "list":
+            return "\n".join(f"- {inline_text(rng, inline_mix, rng.randint(1, 4))}" for _ in range(rng.randint(2, 6)))
+        case "ordered_list":
+            return "\n".join(f"{i}. {inline_text(rng, inline_mix, rng.randint(1, 4))}" for i in range(1, rng.randint(3, 7)))
+        case "quote":
+            return "\n".join(f"> {inline_text(rng, inline_mix, rng.randint(2, 5))}" for _ in range(rng.randint(1, 3)))
+        case "code":
+            lines = [f"    {rng.choice(WORDS)} = {rng.choice(WORDS)}({rng.randint(0, 9)})" for _ in range(rng.randint(2, 8))]
+            if rng.random() < 0.5:
+                lines.insert(rng.randint(1, len(lines) - 1), "")
+            body = "\n".join(lines)
+            return f"```\n{body}\n```"
+        case _:
+            raise ValueError(f"unknown block feature: {kind}")
+
+
+def generate_blocks(size, block_mix=None, inline_mix=None, seed=0):
+    # Yields blocks until their total length reaches `size` characters. The
+    # same arguments always give the same corpus.
+    block_mix = block_mix or BLOCK_MIX
+    inline_mix = inline_mix or INLINE_MIX
+    rng = random.Random(seed)
+    kinds = list(block_mix)
+    weights = list(block_mix.values())
+    total = 0
+    while total < size:
+        block = generate_block(rng, rng.choices(kinds, weights=weights)[0], inline_mix)
+        total += len(block) + 2
+        yield block
+
+
+def generate_corpus(size, block_mix=None, inline_mix=None, seed=0):
+    return "\n\n".join(generate_blocks(size, block_mix, inline_mix, seed)) + "\n"
+
+
+# Inputs that have made markdown parsers go quadratic or backtrack: long runs
+# of unmatched delimiters and brackets, links that never close, and the
+# same link repeated. Each unit is repeated to the requested size.
+PATHOLOGICAL_INLINE = {
+    "unmatched_underscores": "a_ ",
+    "underscores": "_",
+    "unclosed_bold": "**a ",
+    "stars": "*",
+    "backticks": "` x",
+    "open_brackets": "[",
+    "close_brackets": "]",
+    "empty_links": "[]",
+    "unclosed_links": "[a](",
+    "unclosed_images": "![a](",
+    "link_text_only": "[a]",
+    "bangs": "!",
+    "parens": "](",
+    "identical_links": "[link](/same/page) ",
+    "identical_images": "![alt](/same.png) ",
+    "nested_emphasis": "**a _b `c` d_ e** ",
+    "links_in_emphasis": "_[a](/b) c_ ",
+}
+PATHOLOGICAL_BLOCKS = {
+    "short_lines": "a\n",
+    "blank_lines": "\n",
+    "list_items": "- [a](/b) _c_\n",
+    "broken_ordered_list": "1. a\n3. b\n",
+    "ordered_list": None,
+    "quote_lines": "> a\n",
+    "mixed_quote": "> a\nb\n",
+    "too_many_hashes": "####### x\n",
+    "headings": "# a **b**\n\n",
+    "fences": "```\n",
+    "inline_fences": "```x```\n",
+}
+
+
+def pathological(unit, size):
+    return unit * max(1, size // len(unit))
+
+
+def ordered_list(size):
+    # One list whose items keep counting up, so it never turns back into a
+    # paragraph.
+    lines = []
+    total = 0
+    while total < size:
+        lines.append(f"{len(lines) + 1}. item")
+        total += len(lines[-1]) + 1
+    return "\n".join(lines) + "\n"
+
+
+def pathological_block(name, size):
+    if name == "ordered_list":
+        return ordered_list(size)
+    return pathological(PATHOLOGICAL_BLOCKS[name], size)
+
+
+def fuzz_markdown(size, seed=0):
+    # Random runs of pathological units, markup characters and words: the
+    # same seed always gives the same text.
+    rng = random.Random(seed)
+    pieces = [*PATHOLOGICAL_INLINE.values(), *(unit for unit in PATHOLOGICAL_BLOCKS.values() if unit)]
+    pieces += ["*", "_", "`", "[", "]", "(", ")", "!", "#", "\n", " ", "word "]
+    parts = []
+    total = 0
+    while total < size:
+        part = rng.choice(pieces) * rng.randint(1, 50)
+        parts.append(part)
+        total += len(part)
+    return "".join(parts)
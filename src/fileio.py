@@ -0,0 +1,134 @@
+import contextlib
+import os
+import threading
+from collections import deque
+
+
+@contextlib.contextmanager
+def atomic_write(dest_path, mode="w"):
+    # Writes go to a temporary file next to dest_path that replaces it only
+    # once fully written, so a crash never leaves a half-written page.
+    import tempfile
+
+    directory = os.path.dirname(dest_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with open(fd, mode) as f:
+            yield f
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+
+def file_hash(path):
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_state(path, previous=None):
+    # (size, mtime_ns, sha256) of path. previous, the state from an earlier
+    # run (or any tuple starting with it), supplies the hash while size and
+    # mtime are unchanged, so a no-op build does not read every file.
+    stat = os.stat(path)
+    if previous is not None and previous[0] == stat.st_size and previous[1] == stat.st_mtime_ns:
+        return stat.st_size, stat.st_mtime_ns, previous[2]
+    return stat.st_size, stat.st_mtime_ns, file_hash(path)
+
+
+def remove_output(dest_dir, output):
+    # Removes dest_dir/output and any directories that leaves empty.
+    path = os.path.join(dest_dir, output)
+    if os.path.exists(path):
+        os.remove(path)
+    root = os.path.abspath(dest_dir)
+    parent = os.path.dirname(os.path.abspath(path))
+    while parent != root and os.path.isdir(parent) and not os.listdir(parent):
+        os.rmdir(parent)
+        parent = os.path.dirname(parent)
+
+
+def read_text(path):
+    with open(path) as f:
+        return f.read()
+
+
+def read_small_text(path, max_size):
+    # None for a file over max_size bytes, which the caller should stream.
+    with open(path) as f:
+        if os.fstat(f.fileno()).st_size > max_size:
+            return None
+        return f.read()
+
+
+def write_text(dest_path, text):
+    with atomic_write(dest_path) as f:
+        f.write(text)
+
+
+def prefetch(items, key, threads=4, queue_size=16, max_size=None):
+    # Yields (item, text) in order, reading key(item) on a thread pool while
+    # the caller works on earlier items. At most queue_size reads are in
+    # flight or waiting, which bounds memory however far the caller lags.
+    # With max_size, files larger than that are not read: text is None.
+    from concurrent.futures import ThreadPoolExecutor
+
+    def read(path):
+        return read_text(path) if max_size is None else read_small_text(path, max_size)
+
+    items = iter(items)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for item in items:
+            pending.append((item, executor.submit(read, key(item))))
+            if len(pending) >= queue_size:
+                break
+        while pending:
+            item, future = pending.popleft()
+            text = future.result()
+            next_item = next(items, None)
+            if next_item is not None:
+                pending.append((next_item, executor.submit(read, key(next_item))))
+            yield item, text
+
+
+class Writer():
+    # Flushes rendered pages on a thread pool. submit() blocks once
+    # queue_size writes are pending (backpressure); close() waits for them
+    # and re-raises the first failure.
+    def __init__(self, threads=4, queue_size=16):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.slots = threading.BoundedSemaphore(queue_size)
+        self.error = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, dest_path, text):
+        if self.error is not None:
+            raise self.error
+        self.slots.acquire()
+        self.executor.submit(write_text, dest_path, text).add_done_callback(self.done)
+
+    def done(self, future):
+        if future.exception() is not None and self.error is None:
+            self.error = future.exception()
+        self.slots.release()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        if self.error is not None:
+            raise self.error
@@ -1,5 +1,44 @@
-from textnode import TextNode, TextType
-import re
+from textnode import HTML_BUILDERS, LEAF_BUILDERS, TextNode, TextType
+from htmlnode import ParentNode
+import io
+from lazyre import LazyPattern
+from enum import Enum
+
+# Images and links in one alternation: group 1 is "!" for an image.
+MARKDOWN_LINK_PATTERN = LazyPattern(r"(!?)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+INLINE_SPECIAL = LazyPattern(r"[!\[`*_]")
+DELIMITER_TYPES = {"`": TextType.CODE, "_": TextType.ITALIC, "**": TextType.BOLD}
+EMPHASIS_TAGS = {TextType.BOLD: "b", TextType.ITALIC: "i"}
+HEADING_LINE = LazyPattern(r"(#{1,6}) ")
+ORDERED_LINE = LazyPattern(r"(\d+)\. ")
+SLUG_STRIP = LazyPattern(r"[^\w\s-]")
+SLUG_SPACE = LazyPattern(r"[\s-]+")
+
+LINE_BLANK = "blank"
+LINE_FENCE = "fence"
+LINE_HEADING = "heading"
+LINE_QUOTE = "quote"
+LINE_UNORDERED = "unordered"
+LINE_ORDERED = "ordered"
+LINE_TEXT = "text"
+
+
+class BlockType(Enum):
+    PARAGRAPH = "paragraph"
+    HEADING = "heading"
+    CODE = "code"
+    QUOTE = "quote"
+    UNORDERED_LIST = "unordered_list"
+    ORDERED_LIST = "ordered_list"
+
+
+FIRST_LINE_TYPES = {
+    LINE_HEADING: BlockType.HEADING,
+    LINE_QUOTE: BlockType.QUOTE,
+    LINE_UNORDERED: BlockType.UNORDERED_LIST,
+    LINE_ORDERED: BlockType.ORDERED_LIST,
+    LINE_TEXT: BlockType.PARAGRAPH,
+}
 
 
 def type_to_delim(delimiter):
@@ -52,87 +91,228 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_nodes
 
 def extract_markdown_images(text):
-    found = re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
-    return found
+    return [
+        (match.group(2), match.group(3))
+        for match in MARKDOWN_LINK_PATTERN.finditer(text)
+        if match.group(1)
+    ]
 
 def extract_markdown_links(text):
-    found = re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
-    return found 
+    return [
+        (match.group(2), match.group(3))
+        for match in MARKDOWN_LINK_PATTERN.finditer(text)
+        if not match.group(1)
+    ]
 
-def split_nodes_image(old_nodes):
+def split_nodes_matching(old_nodes, text_types):
+    # One finditer pass per TEXT node; the pieces between matches are cut
+    # out by offset instead of searching the text again for each literal.
     new_nodes = []
     for old_node in old_nodes:
         if old_node.text_type != TextType.TEXT:
             new_nodes.append(old_node)
             continue
-        original_text = old_node.text
-        images = extract_markdown_images(original_text)
-        if len(images) == 0:
+        text = old_node.text
+        pos = 0
+        for match in MARKDOWN_LINK_PATTERN.finditer(text):
+            text_type = TextType.IMAGE if match.group(1) else TextType.LINK
+            if text_type not in text_types:
+                continue
+            if pos < match.start():
+                new_nodes.append(TextNode(text[pos:match.start()], TextType.TEXT))
+            new_nodes.append(TextNode(match.group(2), text_type, match.group(3)))
+            pos = match.end()
+        if pos == 0:
             new_nodes.append(old_node)
-            continue
-        for image in images:
-            sections = original_text.split(f"![{image[0]}]({image[1]})", 1)
-            if len(sections) != 2:
-                raise ValueError("invalid markdown, image section not closed")
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-            new_nodes.append(
-                TextNode(
-                    image[0],
-                    TextType.IMAGE,
-                    image[1],
-                )
-            )
-            original_text = sections[1]
-        if original_text != "":
-            new_nodes.append(TextNode(original_text, TextType.TEXT))
+        elif pos < len(text):
+            new_nodes.append(TextNode(text[pos:], TextType.TEXT))
     return new_nodes
 
+def split_nodes_image(old_nodes):
+    return split_nodes_matching(old_nodes, (TextType.IMAGE,))
 
 def split_nodes_link(old_nodes):
-    new_nodes = []
-    for old_node in old_nodes:
-        if old_node.text_type != TextType.TEXT:
-            new_nodes.append(old_node)
+    return split_nodes_matching(old_nodes, (TextType.LINK,))
+
+def split_nodes_link_and_image(old_nodes):
+    return split_nodes_matching(old_nodes, (TextType.LINK, TextType.IMAGE))
+
+def scan_inline(text, start=0, end=None):
+    # Single left-to-right walk over text[start:end], yielding
+    # (text_type, start, end, url) spans. Links and images are matched in
+    # place, a delimiter is paired with the next occurrence of itself, and
+    # plain text is flushed at every boundary just like the old chained
+    # split_nodes_* passes did.
+    if end is None:
+        end = len(text)
+    pos = start
+    plain_start = start
+    while True:
+        found = INLINE_SPECIAL.search(text, pos, end)
+        if found is None:
+            break
+        i = found.start()
+        char = text[i]
+        if char == "!" or char == "[":
+            match = MARKDOWN_LINK_PATTERN.match(text, i, end)
+            if match is None:
+                pos = i + 1
+                continue
+            if plain_start < i:
+                yield TextType.TEXT, plain_start, i, None
+            text_type = TextType.IMAGE if match.group(1) else TextType.LINK
+            yield text_type, match.start(2), match.end(2), match.group(3)
+            pos = plain_start = match.end()
             continue
-        original_text = old_node.text
-        links = extract_markdown_links(original_text)
-        if len(links) == 0:
-            new_nodes.append(old_node)
+        delimiter = "**" if text.startswith("**", i, end) else char
+        if delimiter == "*":
+            pos = i + 1
             continue
-        for link in links:
-            sections = original_text.split(f"[{link[0]}]({link[1]})", 1)
-            if len(sections) != 2:
-                raise ValueError("invalid markdown, link section not closed")
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-            new_nodes.append(TextNode(link[0], TextType.LINK, link[1]))
-            original_text = sections[1]
-        if original_text != "":
-            new_nodes.append(TextNode(original_text, TextType.TEXT))
-    return new_nodes
+        inner_start = i + len(delimiter)
+        close = text.find(delimiter, inner_start, end)
+        if close == -1:
+            raise ValueError("invalid markdown, formatted section not closed")
+        if plain_start < i:
+            yield TextType.TEXT, plain_start, i, None
+        if inner_start < close:
+            yield DELIMITER_TYPES[delimiter], inner_start, close, None
+        pos = plain_start = close + len(delimiter)
+    if plain_start < end:
+        yield TextType.TEXT, plain_start, end, None
 
 def text_to_textnodes(text):
-    node = TextNode(text, TextType.TEXT)
-    node_list = []
-    node_list = split_nodes_link([node])
-    node_list = split_nodes_image(node_list)
-    node_list = split_nodes_delimiter(node_list, "`", TextType.CODE)
-    node_list = split_nodes_delimiter(node_list, "_", TextType.ITALIC)
-    node_list = split_nodes_delimiter(node_list, "**", TextType.BOLD)
-    return node_list
+    # Nested markup inside bold/italic is kept as literal text here, see
+    # text_to_children for the nested rendering.
+    return [
+        TextNode(text[start:end], text_type, url)
+        for text_type, start, end, url in scan_inline(text)
+    ]
 
-def markdown_to_blocks(markdown):
-    blocks = []
+def text_to_children(text, start=0, end=None):
+    children = []
+    for text_type, span_start, span_end, url in scan_inline(text, start, end):
+        if text_type in EMPHASIS_TAGS and INLINE_SPECIAL.search(text, span_start, span_end):
+            inner = text_to_children(text, span_start, span_end)
+            children.append(ParentNode(EMPHASIS_TAGS[text_type], inner))
+            continue
+        children.append(LEAF_BUILDERS[text_type](text[span_start:span_end], url))
+    return children
+
+def text_to_html(text, start=0, end=None):
+    # The HTML text_to_children(...) would render, built straight from the
+    # spans without intermediate TextNodes or LeafNodes.
+    parts = []
+    for text_type, span_start, span_end, url in scan_inline(text, start, end):
+        if text_type in EMPHASIS_TAGS and INLINE_SPECIAL.search(text, span_start, span_end):
+            tag = EMPHASIS_TAGS[text_type]
+            parts.append(f"<{tag}>{text_to_html(text, span_start, span_end)}</{tag}>")
+            continue
+        parts.append(HTML_BUILDERS[text_type](text[span_start:span_end], url))
+    return "".join(parts)
+
+def inline_leaves(text, start=0, end=None):
+    # The spans text_to_children renders as leaves: bold or italic text with
+    # markup inside is walked into, code spans are kept literal.
+    for text_type, span_start, span_end, url in scan_inline(text, start, end):
+        if (text_type is TextType.BOLD or text_type is TextType.ITALIC) and INLINE_SPECIAL.search(text, span_start, span_end):
+            yield from inline_leaves(text, span_start, span_end)
+        else:
+            yield text_type, span_start, span_end, url
+
+def inline_to_html(text, cache=None):
+    if cache is not None:
+        html = cache.get(text)
+        if html is not None:
+            return html
+    html = text_to_html(text)
+    if cache is not None:
+        cache.put(text, html)
+    return html
+
+def heading_level(block):
+    # A heading with no text ("## ") loses its marker's space when the block
+    # is stripped, so the match supplies it.
+    return len(HEADING_LINE.match(block + " ").group(1))
+
+def slugify(text):
+    # "Hello, **World**!" -> "hello-world", the id used for heading anchors.
+    return SLUG_SPACE.sub("-", SLUG_STRIP.sub("", text).strip().lower())
+
+def classify_line(line):
+    # One look at the start of the line decides what it can belong to.
+    if not line.strip():
+        return LINE_BLANK, None
+    first = line[0]
+    if first == "`" and line.startswith("```"):
+        return LINE_FENCE, None
+    if first == "#":
+        heading = HEADING_LINE.match(line)
+        if heading:
+            return LINE_HEADING, len(heading.group(1))
+    elif first == ">":
+        return LINE_QUOTE, None
+    elif first == "-" and line.startswith("- "):
+        return LINE_UNORDERED, None
+    elif first.isdigit():
+        ordered = ORDERED_LINE.match(line)
+        if ordered:
+            return LINE_ORDERED, int(ordered.group(1))
+    return LINE_TEXT, None
+
+def iter_typed_blocks(source):
+    # Single pass over the lines of source (a string, open file or iterable
+    # of lines), yielding (BlockType, block) as each block completes. Fenced
+    # code runs until its closing fence, blank lines included.
+    if isinstance(source, str):
+        source = io.StringIO(source)
     current_block = []
-    lines = markdown.split('\n')
-    for line in lines:
-        if not line.strip():
+    block_type = None
+    in_fence = False
+    for line in source:
+        line = line.rstrip("\n")
+        if in_fence:
+            current_block.append(line)
+            if line.lstrip().startswith("```"):
+                yield BlockType.CODE, '\n'.join(current_block).strip()
+                current_block = []
+                in_fence = False
+            continue
+        kind, number = classify_line(line)
+        if kind == LINE_BLANK:
             if current_block:
-                blocks.append('\n'.join(current_block).strip())
+                yield block_type, '\n'.join(current_block).strip()
                 current_block = []
-        else:
-            current_block.append(line)
+            continue
+        if kind == LINE_FENCE:
+            if current_block:
+                yield block_type, '\n'.join(current_block).strip()
+                current_block = []
+            stripped = line.strip()
+            if len(stripped) >= 6 and stripped.endswith("```"):
+                yield BlockType.CODE, stripped
+            else:
+                current_block.append(line)
+                in_fence = True
+            continue
+        if not current_block:
+            block_type = FIRST_LINE_TYPES[kind]
+            if kind == LINE_ORDERED and number != 1:
+                block_type = BlockType.PARAGRAPH
+        elif block_type == BlockType.QUOTE and kind != LINE_QUOTE:
+            block_type = BlockType.PARAGRAPH
+        elif block_type == BlockType.UNORDERED_LIST and kind != LINE_UNORDERED:
+            block_type = BlockType.PARAGRAPH
+        elif block_type == BlockType.ORDERED_LIST and (kind != LINE_ORDERED or number != len(current_block) + 1):
+            block_type = BlockType.PARAGRAPH
+        current_block.append(line)
     if current_block:
-        blocks.append('\n'.join(current_block).strip())
-    return blocks
+        # An unclosed fence runs to the end of the document.
+        yield (BlockType.CODE if in_fence else block_type), '\n'.join(current_block).strip()
+
+def iter_markdown_blocks(source):
+    # Only the block being collected is held in memory.
+    for _, block in iter_typed_blocks(source):
+        yield block
+
+def markdown_to_blocks(markdown):
+    return list(iter_markdown_blocks(markdown))
@@ -1,5 +1,44 @@
 
+def escape_text(text):
+    # Most text has nothing to escape, and three membership tests are much
+    # cheaper than building a copy, so the common case returns text as is.
+    # Other values (numbers, None) render as str() does, as they always have.
+    if type(text) is not str:
+        text = str(text)
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def escape_attr(value):
+    if type(value) is not str:
+        value = str(value)
+    if "&" not in value and "<" not in value and ">" not in value and '"' not in value:
+        return value
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+def serialize_props(props):
+    return "".join([f' {name}="{escape_attr(value)}"' for name, value in props.items()])
+
+class FrozenProps(dict):
+    # Props shared by many nodes: serialized and escaped once, up front.
+    __slots__ = ("html",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.html = serialize_props(self)
+
+    def __setitem__(self, key, value):
+        raise TypeError("FrozenProps cannot be modified")
+
+    def __delitem__(self, key):
+        raise TypeError("FrozenProps cannot be modified")
+
+    def __reduce__(self):
+        return (FrozenProps, (dict(self),))
+
 class HTMLNode():
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag = None, value = None, children = None, props = None):
         self.tag = tag
         self.value = value
@@ -7,20 +46,27 @@ class HTMLNode():
         self.props = props
 
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def iter_html(self):
         raise NotImplementedError
+
+    def write_html(self, stream):
+        stream.writelines(self.iter_html())
     
     def props_to_html(self):
         if self.props is None:
             return ""
-        props_html = ""
-        for prop in self.props:
-            props_html += f' {prop}="{self.props[prop]}"'
-        return props_html
+        if type(self.props) is FrozenProps:
+            return self.props.html
+        return serialize_props(self.props)
 
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, children: {self.children}, {self.props})"
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props = None):
         super().__init__(tag, value, None, props)
 
@@ -28,23 +74,62 @@ class LeafNode(HTMLNode):
         if self.value is None:
             raise ValueError("invalid HTML: no value")
         if self.tag is None:
-            return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+            return escape_text(self.value)
+        return f"<{self.tag}{self.props_to_html()}>{escape_text(self.value)}</{self.tag}>"
+
+    def iter_html(self):
+        yield self.to_html()
 
     def __repr__(self):
         return f"LeaftNode({self.tag}, {self.value}, {self.props})"
 
+class RawNode(LeafNode):
+    # Already-rendered HTML, such as a cached fragment; emitted unescaped.
+    __slots__ = ()
+
+    def __init__(self, html):
+        super().__init__(None, html)
+
+    def to_html(self):
+        if self.value is None:
+            raise ValueError("invalid HTML: no value")
+        return self.value
+
+    def __repr__(self):
+        return f"RawNode({self.value})"
+
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props = None):
         super().__init__(tag, None, children, props)
     
-    def to_html(self):
+    def open_tag(self):
         if self.tag is None:
             raise ValueError("invalid HTML: no tag")
         if self.children is None:
             raise ValueError("invalid HTML: no children")
-        html = f"<{self.tag}>"
-        for child in self.children:
-            html += child.to_html()
-        html += f"</{self.tag}>"
-        return html
\ No newline at end of file
+        if self.props is None:
+            return f"<{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>"
+
+    def iter_html(self):
+        # Walks the tree with an explicit stack of open elements instead of
+        # recursing, so nesting depth is limited by memory, not by the
+        # interpreter's recursion limit.
+        yield self.open_tag()
+        stack = [(self.tag, iter(self.children))]
+        while stack:
+            tag, children = stack[-1]
+            for child in children:
+                if isinstance(child, ParentNode):
+                    yield child.open_tag()
+                    stack.append((child.tag, iter(child.children)))
+                    break
+                if isinstance(child, LeafNode):
+                    yield child.to_html()
+                else:
+                    yield from child.iter_html()
+            else:
+                stack.pop()
+                yield f"</{tag}>"
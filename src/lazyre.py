@@ -0,0 +1,20 @@
+class LazyPattern():
+    # A regex compiled on first use instead of at import. Methods of the
+    # compiled pattern are copied onto the instance as they are looked up,
+    # so later calls cost the same as on a module-level re.compile().
+    def __init__(self, pattern, flags=0):
+        self.source = pattern
+        self.source_flags = flags
+        self.compiled = None
+
+    def __getattr__(self, name):
+        if self.compiled is None:
+            import re
+
+            self.compiled = re.compile(self.source, self.source_flags)
+        value = getattr(self.compiled, name)
+        setattr(self, name, value)
+        return value
+
+    def __repr__(self):
+        return f"LazyPattern({self.source!r})"
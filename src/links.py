@@ -0,0 +1,163 @@
+import posixpath
+from urllib.parse import urlsplit
+
+from blocks import inline_texts
+from helpers import BlockType, heading_level, inline_leaves, iter_typed_blocks, slugify
+from search import add_terms
+from textnode import TextType
+
+
+class PageScan():
+    # What the build records about a page besides its HTML: outgoing links,
+    # images and heading anchors, plus the search terms when terms=True.
+    # Blocks are added one at a time as they are rendered, and their inline
+    # markdown is parsed into the same spans rendering uses, so code blocks,
+    # `code spans` and link URLs never count as text or links.
+    def __init__(self, terms=False):
+        self.title = None
+        self.links = []
+        self.images = []
+        self.anchors = []
+        self.terms = {} if terms else None
+
+    def add(self, block_type, block):
+        if block_type is BlockType.CODE:
+            return
+        if block_type is BlockType.HEADING:
+            level = heading_level(block)
+            slug = slugify(block[level + 1:])
+            if slug:
+                self.anchors.append(slug)
+        has_links = "](" in block
+        if self.terms is None and not has_links:
+            return
+        if not has_links:
+            # Markup is punctuation to the tokenizer, so without links (and
+            # their URLs) the inline texts can be counted as they are.
+            add_terms(self.terms, " ".join(inline_texts(block_type, block)))
+            return
+        words = []
+        for text in inline_texts(block_type, block):
+            for text_type, start, end, url in inline_leaves(text):
+                if text_type is TextType.LINK:
+                    self.links.append(url)
+                elif text_type is TextType.IMAGE:
+                    self.images.append(url)
+                words.append(text[start:end])
+        if self.terms is not None:
+            add_terms(self.terms, " ".join(words))
+
+
+def scan_page(source, terms=False):
+    scan = PageScan(terms)
+    for block_type, block in iter_typed_blocks(source):
+        scan.add(block_type, block)
+    return scan
+
+
+def page_links(source):
+    scan = scan_page(source)
+    return {"links": scan.links, "images": scan.images, "anchors": scan.anchors}
+
+
+def is_external(url):
+    if url.startswith(("/", "#", ".")) and not url.startswith("//"):
+        return False
+    parts = urlsplit(url)
+    return bool(parts.scheme or parts.netloc)
+
+
+def resolve(page_path, url):
+    # Resolves url against the page's output path ("/blog/post.html") and
+    # returns (path, fragment); index pages are spelled out in full.
+    path, _, fragment = url.partition("#")
+    path = path.partition("?")[0]
+    if not path:
+        return page_path, fragment
+    if not path.startswith("/"):
+        trailing = path.endswith("/")
+        path = posixpath.normpath(posixpath.join(posixpath.dirname(page_path), path))
+        if trailing and path != "/":
+            path += "/"
+    if path.endswith("/"):
+        path += "index.html"
+    return path, fragment
+
+
+class LinkIndex():
+    # Site-wide index built from the manifest: every page's outgoing links,
+    # images and anchors, keyed by output path, plus the static files.
+    # Checking is one pass over all links with set lookups, so it costs time
+    # linear in the total link count and never re-reads HTML.
+    def __init__(self):
+        self.pages = {}
+        self.sources = {}
+        self.anchors = {}
+        self.files = set()
+
+    @classmethod
+    def from_entries(cls, pages, assets=None):
+        # pages: page -> (output, links, images, anchors), as saved by the
+        # build; assets: the static manifest's files.
+        index = cls()
+        for source, (output, links, images, anchors) in pages.items():
+            index.add_page(source, output, links, images, anchors)
+        for entry in (assets or {}).values():
+            index.files.add("/" + entry["output"].replace("\\", "/"))
+        return index
+
+    def add_page(self, source, output, links=(), images=(), anchors=()):
+        path = "/" + output.replace("\\", "/")
+        self.pages[path] = (links, images)
+        self.sources[path] = source
+        self.anchors[path] = set(anchors)
+
+    def find_target(self, path):
+        # "/about" may mean /about.html or /about/index.html.
+        for candidate in (path, path + ".html", path + "/index.html"):
+            if candidate in self.pages or candidate in self.files:
+                return candidate
+        return None
+
+    def check(self):
+        broken = []
+        for path, (links, images) in self.pages.items():
+            source = self.sources[path]
+            for url in links:
+                if is_external(url):
+                    continue
+                target_path, fragment = resolve(path, url)
+                target = self.find_target(target_path)
+                if target is None:
+                    broken.append((source, url, "missing page"))
+                elif fragment and target in self.anchors and fragment not in self.anchors[target]:
+                    broken.append((source, url, "missing anchor"))
+            for url in images:
+                if not is_external(url) and self.find_target(resolve(path, url)[0]) is None:
+                    broken.append((source, url, "missing image"))
+        return broken
+
+    def linked_from(self, outputs):
+        # Source pages whose links point at any of the given output paths,
+        # e.g. the pages to revisit when those outputs are renamed or removed.
+        targets = set()
+        for output in outputs:
+            path = "/" + output.replace("\\", "/")
+            targets.add(path)
+            if path.endswith("/index.html"):
+                targets.add(path[:-len("/index.html")])
+            elif path.endswith(".html"):
+                targets.add(path[:-len(".html")])
+        pages = set()
+        for path, (links, images) in self.pages.items():
+            for url in [*links, *images]:
+                if is_external(url) or url.startswith("#"):
+                    continue
+                if resolve(path, url)[0] in targets:
+                    pages.add(self.sources[path])
+                    break
+        return pages
+
+
+def format_broken(broken):
+    return "\n".join(f"{source}: {url} ({reason})" for source, url, reason in broken)
@@ -1,7 +1,306 @@
-from textnode import TextNode
+import argparse
+import os
+import sys
 
-def main():
-    dummy = TextNode("anchor text", "link", "boot.dev")
-    print(dummy)
+CONTENT_DIR = "content"
+TEMPLATE_PATH = "template.html"
+STATIC_DIR = "static"
+DEST_DIR = "public"
+MANIFEST_PATH = ".cache/manifest"
+STATIC_MANIFEST_PATH = ".cache/static-manifest.json"
+INLINE_CACHE_PATH = ".cache/inline-cache.json"
+BLOCK_CACHE_PATH = ".cache/block-cache.json"
+SHARDS_DIR = ".cache/shards"
 
-main()
\ No newline at end of file
+def load_cache(args, max_entries, max_bytes, path):
+    if not max_entries and not max_bytes:
+        return None
+    from cache import LRUCache
+
+    cache = LRUCache(max_entries or None, max_bytes or None)
+    if not args.no_persist_cache:
+        cache.load(path)
+    return cache
+
+def report_cache(args, name, cache, path):
+    if cache is None:
+        return
+    print(f"{name} cache: {cache}")
+    if not args.no_persist_cache:
+        cache.save(path)
+
+def make_profiler(args):
+    if not (args.profile or args.profile_allocations or args.trace):
+        return None
+    from profiling import Profiler
+
+    return Profiler(trace_allocations=args.profile_allocations)
+
+def sync(args, force=False):
+    from assets import sync_static
+
+    return sync_static(
+        STATIC_DIR, DEST_DIR, STATIC_MANIFEST_PATH, force=force,
+        workers=args.static_workers, link=args.link_static, fingerprint=args.fingerprint,
+    )
+
+def asset_outputs(args):
+    # Fingerprinted names for the template's {{ asset:<path> }} slots;
+    # without --fingerprint the slots link the plain names.
+    if not args.fingerprint:
+        return None
+    from assets import static_outputs
+
+    return static_outputs(STATIC_DIR, STATIC_MANIFEST_PATH)
+
+def check_links():
+    from assets import load_static_manifest
+    from build import load_links
+    from links import LinkIndex, format_broken
+
+    index = LinkIndex.from_entries(load_links(MANIFEST_PATH) or {}, load_static_manifest(STATIC_MANIFEST_PATH))
+    broken = index.check()
+    if broken:
+        print(format_broken(broken))
+    print(f"checked {len(index.pages)} pages: {len(broken)} broken links")
+    return broken
+
+def shard_paths(shard_dir):
+    # A shard build keeps its pages and partial manifest together, so the
+    # directory is all a machine has to hand back for the merge.
+    return os.path.join(shard_dir, "public"), os.path.join(shard_dir, "manifest")
+
+def build(args, inline_cache=None, block_cache=None, shard=None, shard_dir=None):
+    from build import build_site
+
+    profiler = make_profiler(args)
+    if shard is None:
+        dest_dir, manifest_path = DEST_DIR, MANIFEST_PATH
+        print(sync(args, force=args.force))
+    else:
+        # Static files are synced once, by merge.
+        dest_dir, manifest_path = shard_paths(shard_dir)
+    stats = build_site(
+        CONTENT_DIR, TEMPLATE_PATH, dest_dir, manifest_path,
+        force=args.force, workers=args.workers, chunksize=args.chunksize, io_threads=args.io_threads,
+        inline_cache=inline_cache, block_cache=block_cache, profiler=profiler, shard=shard,
+        search_index=not args.no_search_index, assets=asset_outputs(args),
+    )
+    print(stats)
+    if stats.search is not None:
+        print(stats.search)
+    if args.explain and stats.reasons:
+        print(stats.explain())
+    if profiler is not None:
+        print(profiler.report())
+        if args.trace:
+            profiler.write_chrome_trace(args.trace)
+            print(f"trace written to {args.trace}")
+    report_cache(args, "inline", inline_cache, INLINE_CACHE_PATH)
+    report_cache(args, "block", block_cache, BLOCK_CACHE_PATH)
+    return stats
+
+def report_build_failure(error, context=""):
+    # Any exception a build raises (invalid markdown, a missing partial, an
+    # unreadable file) is reported the same way and leaves watch running.
+    print(f"{context}build failed: {error}", file=sys.stderr)
+
+def rebuild_after_change(args, server_state, changed, inline_cache=None, block_cache=None):
+    # One watch-mode rebuild. A failing build (usually a page saved mid-edit
+    # with an unclosed _ or **) is reported and the browser is left on the
+    # last good version; the next save tries again.
+    from build import build_site
+
+    try:
+        # Assets first, so pages link their new fingerprinted names.
+        assets = sync(args)
+        stats = build_site(
+            CONTENT_DIR, TEMPLATE_PATH, DEST_DIR, MANIFEST_PATH,
+            io_threads=args.io_threads, inline_cache=inline_cache, block_cache=block_cache,
+            search_index=not args.no_search_index, assets=asset_outputs(args),
+        )
+    except Exception as e:
+        report_build_failure(e, f"{len(changed)} file(s) changed: ")
+        return False
+    server_state.generation += 1
+    per_page = stats.render_time * 1000 / stats.rebuilt if stats.rebuilt else 0.0
+    print(f"{len(changed)} file(s) changed: {stats}, {per_page:.1f} ms/page")
+    if args.explain and stats.reasons:
+        print(stats.explain())
+    if block_cache is not None:
+        print(f"block cache: {block_cache}")
+    if assets.copied or assets.deleted:
+        print(assets)
+    return True
+
+def watch_and_serve(args, inline_cache=None, block_cache=None):
+    from template import load_template
+    from watch import make_watcher, serve, watch
+
+    server = serve(DEST_DIR, args.port, live_reload=not args.no_live_reload)
+    print(f"serving {DEST_DIR}/ at http://127.0.0.1:{server.server_address[1]}/")
+    watched = [CONTENT_DIR, STATIC_DIR, *load_template(TEMPLATE_PATH).dependencies]
+    watcher = make_watcher(watched, poll=args.poll)
+    print(f"watching with {type(watcher).__name__}")
+
+    def rebuild(changed):
+        rebuild_after_change(args, server.state, changed, inline_cache, block_cache)
+
+    try:
+        watch(watcher, rebuild, debounce=args.debounce)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        server.shutdown()
+
+def add_static_arguments(parser):
+    parser.add_argument("--static-workers", type=int, default=4, help="threads used to copy static assets")
+    parser.add_argument("--link-static", action="store_true", help="hard-link static assets into the output when possible")
+    parser.add_argument("--fingerprint", action="store_true", help="add content hashes to static file names (see assets.json)")
+
+def add_build_arguments(parser):
+    parser.add_argument("--force", action="store_true", help="rebuild every page, ignoring the manifest")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes used to render pages")
+    parser.add_argument("--chunksize", type=int, default=None, help="pages handed to a worker at a time")
+    parser.add_argument("--io-threads", type=int, default=4, help="threads reading sources and writing pages alongside a serial build (0 to disable)")
+    add_static_arguments(parser)
+    parser.add_argument("--no-search-index", action="store_true", help=f"do not write {DEST_DIR}/search.json")
+    parser.add_argument("--explain", action="store_true", help="print why each page was rebuilt")
+    parser.add_argument("--inline-cache", type=int, default=0, metavar="ENTRIES", help="cache rendered inline HTML, keeping at most ENTRIES")
+    parser.add_argument("--inline-cache-bytes", type=int, default=0, metavar="BYTES", help="cap the inline cache size in bytes")
+    parser.add_argument("--block-cache", type=int, default=0, metavar="ENTRIES", help="cache rendered blocks by content hash, keeping at most ENTRIES")
+    parser.add_argument("--no-persist-cache", action="store_true", help="do not load or save caches under .cache/")
+    parser.add_argument("--profile", action="store_true", help="report the slowest pages and pipeline stages")
+    parser.add_argument("--profile-allocations", action="store_true", help="also trace allocations (slow)")
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome trace of the build to PATH")
+
+def load_caches(args):
+    inline_cache = load_cache(args, args.inline_cache, args.inline_cache_bytes, INLINE_CACHE_PATH)
+    block_cache = load_cache(args, args.block_cache, 0, BLOCK_CACHE_PATH)
+    return inline_cache, block_cache
+
+def run_build(args):
+    if args.shard is not None:
+        shard_dir = args.shard_dir or os.path.join(SHARDS_DIR, f"{args.shard[0]}-of-{args.shard[1]}")
+        build(args, *load_caches(args), shard=args.shard, shard_dir=shard_dir)
+        return 0
+    build(args, *load_caches(args))
+    if args.check_links and check_links():
+        return 1
+    return 0
+
+def run_watch(args):
+    inline_cache, block_cache = load_caches(args)
+    try:
+        build(args, inline_cache, block_cache)
+    except Exception as e:
+        # Serve what there is; saving a fix triggers the next build.
+        report_build_failure(e)
+    watch_and_serve(args, inline_cache, block_cache)
+    return 0
+
+def run_check_links(args):
+    return 1 if check_links() else 0
+
+def run_merge(args):
+    from build import merge_shards
+
+    shard_dirs = args.shard_dirs
+    if not shard_dirs and os.path.isdir(SHARDS_DIR):
+        shard_dirs = sorted(os.path.join(SHARDS_DIR, name) for name in os.listdir(SHARDS_DIR))
+    print(sync(args, force=args.force))
+    try:
+        stats = merge_shards([shard_paths(shard_dir) for shard_dir in shard_dirs], DEST_DIR, MANIFEST_PATH)
+    except ValueError as e:
+        print(f"merge failed: {e}", file=sys.stderr)
+        return 2
+    print(stats)
+    if stats.search is not None:
+        print(stats.search)
+    return 1 if check_links() else 0
+
+def run_search(args):
+    from build import SEARCH_INDEX
+    from search import SearchIndex
+
+    try:
+        index = SearchIndex.load(os.path.join(DEST_DIR, SEARCH_INDEX))
+    except FileNotFoundError:
+        print(f"no search index in {DEST_DIR}/: build the site first", file=sys.stderr)
+        return 2
+    results = index.search(" ".join(args.query), limit=args.limit)
+    for url, title, score in results:
+        print(f"{score:8.3f}  {url}  {title}")
+    print(f"{len(results)} results")
+    return 0 if results else 1
+
+def run_bench(args, extra):
+    import bench
+
+    bench.main(extra)
+    return 0
+
+def shard_argument(text):
+    from build import parse_shard
+
+    try:
+        return parse_shard(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N with 1 <= I <= N, got {text!r}")
+
+def main(argv=None):
+    # Subcommands only import what they use: --help needs argparse alone,
+    # and a build with nothing to render never loads the markdown pipeline.
+    argv = sys.argv[1:] if argv is None else argv
+    # Plain `main.py` or `main.py --force` still means build.
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        argv = ["build", *argv]
+    parser = argparse.ArgumentParser(description="Build, check and preview the static site")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="build the site into public/ (default)")
+    add_build_arguments(build_parser)
+    build_parser.add_argument("--check-links", action="store_true", help="report broken internal links, images and anchors after building")
+    build_parser.add_argument("--shard", type=shard_argument, metavar="I/N", help="build only the I-th of N shards of the site (see merge)")
+    build_parser.add_argument("--shard-dir", metavar="DIR", help=f"where a shard build writes its pages and manifest (default {SHARDS_DIR}/I-of-N)")
+    build_parser.set_defaults(run=run_build)
+
+    watch_parser = commands.add_parser("watch", help="build, then rebuild on changes and serve the site locally")
+    add_build_arguments(watch_parser)
+    watch_parser.add_argument("--port", type=int, default=8888, help="preview server port")
+    watch_parser.add_argument("--poll", action="store_true", help="poll for changes instead of using inotify")
+    watch_parser.add_argument("--debounce", type=float, default=0.1, help="seconds of quiet before rebuilding")
+    watch_parser.add_argument("--no-live-reload", action="store_true", help="do not inject the live-reload script")
+    watch_parser.set_defaults(run=run_watch)
+
+    check_parser = commands.add_parser("check-links", help="report broken links recorded by the last build")
+    check_parser.set_defaults(run=run_check_links)
+
+    merge_parser = commands.add_parser("merge", help="combine shard builds into public/ and check links across them")
+    merge_parser.add_argument("shard_dirs", nargs="*", metavar="SHARD_DIR", help=f"shard build directories (default: everything in {SHARDS_DIR}/)")
+    merge_parser.add_argument("--force", action="store_true", help="recopy every static asset")
+    add_static_arguments(merge_parser)
+    merge_parser.set_defaults(run=run_merge)
+
+    search_parser = commands.add_parser("search", help="query the search index of the last build")
+    search_parser.add_argument("query", nargs="+", help="words every result must contain")
+    search_parser.add_argument("--limit", type=int, default=10, help="show at most this many results")
+    search_parser.set_defaults(run=run_search)
+
+    # Everything after `bench` is handed to bench.py's own parser.
+    bench_parser = commands.add_parser("bench", help="run benchmarks (see `bench --help`)", add_help=False)
+    bench_parser.set_defaults(run=run_bench)
+
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "bench":
+        return args.run(args, extra)
+    if extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    if args.command == "build" and args.shard is not None and args.check_links:
+        parser.error("--check-links needs the whole site: shard builds are checked by merge")
+    return args.run(args)
+
+# Guarded so worker processes started with spawn do not rerun the build.
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import contextlib
+import json
+import os
+import time
+import tracemalloc
+
+
+class Profiler():
+    # Collects wall time, node counts and (optionally) tracemalloc
+    # allocations per page and per pipeline stage. Code that is not handed a
+    # profiler takes its normal, uninstrumented path.
+    def __init__(self, trace_allocations=False):
+        self.trace_allocations = trace_allocations
+        self.pages = {}
+
+    @contextlib.contextmanager
+    def page(self, name):
+        record = {"start": time.perf_counter(), "pid": os.getpid(), "stages": {}, "peak_bytes": None}
+        started_tracing = False
+        if self.trace_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - record["start"]
+            if self.trace_allocations:
+                record["peak_bytes"] = tracemalloc.get_traced_memory()[1] - base
+                if started_tracing:
+                    tracemalloc.stop()
+            self.pages[name] = record
+
+    @contextlib.contextmanager
+    def stage(self, page, name):
+        counts = {"nodes": 0}
+        if self.trace_allocations:
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield counts
+        finally:
+            elapsed = time.perf_counter() - start
+            allocated = tracemalloc.get_traced_memory()[0] - before if self.trace_allocations else 0
+            self.add(page, name, elapsed, counts["nodes"], allocated)
+
+    def add(self, page, name, seconds, nodes=0, allocated=0):
+        stage = page["stages"].setdefault(name, {"seconds": 0.0, "calls": 0, "nodes": 0, "allocated_bytes": 0})
+        stage["seconds"] += seconds
+        stage["calls"] += 1
+        stage["nodes"] += nodes
+        stage["allocated_bytes"] += allocated
+
+    def merge(self, pages):
+        self.pages.update(pages)
+
+    def stage_totals(self):
+        totals = {}
+        for record in self.pages.values():
+            for name, stage in record["stages"].items():
+                total = totals.setdefault(name, {"seconds": 0.0, "calls": 0, "nodes": 0, "allocated_bytes": 0})
+                for key in total:
+                    total[key] += stage[key]
+        return totals
+
+    def report(self, limit=10):
+        lines = [f"slowest pages (of {len(self.pages)}):"]
+        pages = sorted(self.pages.items(), key=lambda item: item[1]["seconds"], reverse=True)
+        for name, record in pages[:limit]:
+            peak = f"  peak {record['peak_bytes'] / 1e6:.2f} MB" if record["peak_bytes"] is not None else ""
+            lines.append(f"  {record['seconds'] * 1000:9.2f} ms  {name}{peak}")
+        lines.append("slowest stages:")
+        stages = sorted(self.stage_totals().items(), key=lambda item: item[1]["seconds"], reverse=True)
+        for name, total in stages:
+            allocated = f"  alloc {total['allocated_bytes'] / 1e6:.2f} MB" if self.trace_allocations else ""
+            lines.append(
+                f"  {total['seconds'] * 1000:9.2f} ms  {name:<20} {total['calls']:>8} calls "
+                f"{total['nodes']:>9} nodes{allocated}"
+            )
+        return "\n".join(lines)
+
+    def write_chrome_trace(self, path):
+        # One complete ("X") event per page in the Chrome trace event format,
+        # loadable in chrome://tracing or Perfetto; stage totals go in args.
+        if not self.pages:
+            events = []
+        else:
+            origin = min(record["start"] for record in self.pages.values())
+            events = [
+                {
+                    "name": name,
+                    "cat": "page",
+                    "ph": "X",
+                    "ts": (record["start"] - origin) * 1e6,
+                    "dur": record["seconds"] * 1e6,
+                    "pid": record["pid"],
+                    "tid": record["pid"],
+                    "args": {stage: round(values["seconds"] * 1e6) for stage, values in record["stages"].items()},
+                }
+                for name, record in sorted(self.pages.items(), key=lambda item: item[1]["start"])
+            ]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
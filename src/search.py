@@ -0,0 +1,130 @@
+import json
+import math
+
+from fileio import write_text
+from lazyre import LazyPattern
+
+# Letters and digits; "_" and markdown markup split words.
+WORD_PATTERN = LazyPattern(r"[^\W_]+")
+COMBINING_MARKS = LazyPattern("[\u0300-\u036f]")
+# ASCII text takes a faster path: every other ASCII character becomes a
+# space and str.split finds the words.
+ASCII_SEPARATORS = str.maketrans({chr(c): " " for c in range(128) if not chr(c).isalnum()})
+MIN_TOKEN_LENGTH = 2
+SEARCH_INDEX_VERSION = 1
+
+
+class IndexStats():
+    def __init__(self):
+        self.indexed = 0
+        self.pages = 0
+        self.terms = 0
+        self.bytes = 0
+        self.total_time = 0.0
+
+    def __repr__(self):
+        size = f", {self.bytes} bytes" if self.bytes else ""
+        return (
+            f"search index: indexed {self.indexed} of {self.pages} pages "
+            f"({self.terms} terms{size}) in {self.total_time:.3f}s"
+        )
+
+
+def tokenize(text):
+    # Case-folded words, with accents folded off ("Café" -> "cafe") by
+    # dropping the combining marks NFKD splits them into.
+    if text.isascii():
+        words = text.lower().translate(ASCII_SEPARATORS).split()
+    else:
+        import unicodedata
+
+        text = COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", text))
+        words = WORD_PATTERN.findall(text.casefold())
+    return [word for word in words if len(word) >= MIN_TOKEN_LENGTH]
+
+
+def add_terms(counts, text):
+    # Counts the words of text into counts (term -> count).
+    for word in tokenize(text):
+        counts[word] = counts.get(word, 0) + 1
+
+
+class SearchIndex():
+    # An inverted index: pages is a list of (url, title) and terms maps each
+    # term to its postings, a list of (page number, count) in page order.
+    # On disk the postings are flattened and the page numbers delta-encoded,
+    # [gap, count, gap, count, ...], which keeps most numbers to one digit.
+    def __init__(self, pages=None, terms=None):
+        self.pages = pages or []
+        self.terms = terms or {}
+
+    @classmethod
+    def from_pages(cls, pages):
+        # pages: page -> (url, title, term counts), as kept by the build.
+        index = cls()
+        for number, page in enumerate(sorted(pages)):
+            url, title, counts = pages[page]
+            index.pages.append((url, title))
+            for term, count in counts.items():
+                index.terms.setdefault(term, []).append((number, count))
+        return index
+
+    def to_json(self):
+        terms = {}
+        for term in sorted(self.terms):
+            encoded = []
+            last = 0
+            for number, count in self.terms[term]:
+                encoded.append(number - last)
+                encoded.append(count)
+                last = number
+            terms[term] = encoded
+        data = {"version": SEARCH_INDEX_VERSION, "pages": self.pages, "terms": terms}
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        if data.get("version") != SEARCH_INDEX_VERSION:
+            raise ValueError(f"unsupported search index version: {data.get('version')}")
+        index = cls([tuple(page) for page in data["pages"]])
+        for term, encoded in data["terms"].items():
+            postings = []
+            number = 0
+            for i in range(0, len(encoded), 2):
+                number += encoded[i]
+                postings.append((number, encoded[i + 1]))
+            index.terms[term] = postings
+        return index
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_json(f.read())
+
+    def search(self, query, limit=10):
+        # Pages containing every query term, best first by tf-idf.
+        words = set(tokenize(query))
+        if not words:
+            return []
+        scores = None
+        for word in words:
+            postings = self.terms.get(word)
+            if not postings:
+                return []
+            idf = math.log(1 + len(self.pages) / len(postings))
+            found = {number: count * idf for number, count in postings}
+            if scores is None:
+                scores = found
+            else:
+                scores = {number: score + found[number] for number, score in scores.items() if number in found}
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(*self.pages[number], round(score, 3)) for number, score in ranked]
+
+
+def write_index(path, pages, stats):
+    index = SearchIndex.from_pages(pages)
+    text = index.to_json()
+    write_text(path, text)
+    stats.terms = len(index.terms)
+    stats.bytes = len(text.encode())
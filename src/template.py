@@ -0,0 +1,88 @@
+import os
+from lazyre import LazyPattern
+
+# "{{ Title }}", or "{{ asset:css/site.css }}" for the URL of a static file.
+SLOT_PATTERN = LazyPattern(r"\{\{\s*(\w+(?::[\w./-]+)?)\s*\}\}")
+PARTIAL_PATTERN = LazyPattern(r"\{\{>\s*([\w./-]+)\s*\}\}")
+
+
+class Template():
+    # A template is parsed once into alternating literal and slot segments;
+    # rendering walks the segments instead of running str.replace for every
+    # placeholder on every page.
+    def __init__(self, text):
+        self.dependencies = []
+        self.literals = []
+        self.slots = []
+        pos = 0
+        for match in SLOT_PATTERN.finditer(text):
+            self.literals.append(text[pos:match.start()])
+            self.slots.append(match.group(1))
+            pos = match.end()
+        self.literals.append(text[pos:])
+
+    def __repr__(self):
+        return f"Template(slots: {self.slots})"
+
+    def write(self, stream, values):
+        # A value may be a string or a callable that writes itself to the
+        # stream, which lets page content be streamed into the layout.
+        # Missing values render as empty strings.
+        literals = self.literals
+        for i, slot in enumerate(self.slots):
+            stream.write(literals[i])
+            value = values.get(slot, "")
+            if callable(value):
+                value(stream)
+            else:
+                stream.write(value)
+        stream.write(literals[-1])
+
+    def render(self, values):
+        parts = [self.literals[0]]
+        for i, slot in enumerate(self.slots):
+            parts.append(values.get(slot, ""))
+            parts.append(self.literals[i + 1])
+        return "".join(parts)
+
+
+compiled_templates = {}
+
+
+def read_template(path, dependencies, including=()):
+    # Inlines {{> partial.html }} includes (relative to the including file)
+    # and records every file read in dependencies.
+    if path in including:
+        raise ValueError(f"template includes itself: {path}")
+    dependencies.add(path)
+    with open(path) as f:
+        text = f.read()
+    directory = os.path.dirname(path)
+
+    def include(match):
+        return read_template(os.path.join(directory, match.group(1)), dependencies, including + (path,))
+
+    return PARTIAL_PATTERN.sub(include, text)
+
+
+def file_key(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def load_template(path):
+    # Compiled templates are kept per path and only re-read when the mtime
+    # or size of the template or one of its partials changes, so repeated
+    # builds (watch mode) reuse them.
+    cached = compiled_templates.get(path)
+    if cached is not None:
+        try:
+            if all(file_key(dependency) == key for dependency, key in cached[0]):
+                return cached[1]
+        except FileNotFoundError:
+            pass
+    dependencies = set()
+    template = Template(read_template(path, dependencies))
+    template.dependencies = sorted(dependencies)
+    compiled_templates[path] = ([(dependency, file_key(dependency)) for dependency in template.dependencies], template)
+    return template
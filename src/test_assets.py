@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import unittest
+
+from assets import copy_asset, fingerprinted_path, static_outputs, sync_static
+
+
+class TestSyncStatic(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "public")
+        self.manifest = os.path.join(self.root, ".cache", "static-manifest.json")
+        self.write("static/styles.css", "body { color: red; }")
+        self.write("static/images/logo.png", "\x89PNG fake")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(os.path.join(self.root, path)) as f:
+            return f.read()
+
+    def sync(self, **kwargs):
+        return sync_static(self.static, self.public, self.manifest, **kwargs)
+
+    def test_copies_then_skips(self):
+        stats = self.sync()
+        self.assertEqual((stats.copied, stats.skipped, stats.deleted), (2, 0, 0))
+        self.assertEqual(stats.bytes_copied, os.path.getsize(os.path.join(self.static, "styles.css")) + os.path.getsize(os.path.join(self.static, "images", "logo.png")))
+        self.assertEqual(self.read("public/images/logo.png"), "\x89PNG fake")
+        stats = self.sync()
+        self.assertEqual((stats.copied, stats.skipped, stats.bytes_copied), (0, 2, 0))
+
+    def test_changed_asset_is_recopied(self):
+        self.sync()
+        self.write("static/styles.css", "body { color: blue; }")
+        stats = self.sync()
+        self.assertEqual((stats.copied, stats.skipped), (1, 1))
+        self.assertEqual(self.read("public/styles.css"), "body { color: blue; }")
+
+    def test_missing_output_is_recopied(self):
+        self.sync()
+        os.remove(os.path.join(self.public, "styles.css"))
+        stats = self.sync()
+        self.assertEqual((stats.copied, stats.skipped), (1, 1))
+
+    def test_deleted_asset_is_removed(self):
+        self.sync()
+        os.remove(os.path.join(self.static, "images", "logo.png"))
+        stats = self.sync()
+        self.assertEqual(stats.deleted, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images")))
+
+    def test_force_still_removes_deleted_assets(self):
+        self.sync()
+        os.remove(os.path.join(self.static, "images", "logo.png"))
+        stats = self.sync(force=True)
+        self.assertEqual((stats.copied, stats.skipped, stats.deleted), (1, 0, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images")))
+
+    def test_link_does_not_write_through(self):
+        stats = self.sync(link=True)
+        self.assertEqual(stats.methods.get("linked"), 2)
+        self.write("static/styles.css", "changed")
+        self.sync(link=True)
+        self.assertEqual(self.read("public/styles.css"), "changed")
+        copy_asset(os.path.join(self.static, "images", "logo.png"), os.path.join(self.public, "styles.css"))
+        self.assertEqual(self.read("static/styles.css"), "changed")
+
+    def test_fingerprint(self):
+        self.sync(fingerprint=True)
+        with open(os.path.join(self.public, "assets.json")) as f:
+            mapping = json.load(f)
+        self.assertRegex(mapping["styles.css"], r"^styles\.[0-9a-f]{10}\.css$")
+        self.assertEqual(self.read(os.path.join("public", mapping["styles.css"])), "body { color: red; }")
+        self.write("static/styles.css", "body { color: blue; }")
+        self.sync(fingerprint=True)
+        self.assertFalse(os.path.exists(os.path.join(self.public, mapping["styles.css"])))
+        with open(os.path.join(self.public, "assets.json")) as f:
+            self.assertEqual(static_outputs(self.static, self.manifest), json.load(f))
+        self.sync(force=True, fingerprint=True)
+        self.assertEqual(sorted(os.listdir(self.public)), ["assets.json", "images", static_outputs(self.static, self.manifest)["styles.css"]])
+        self.sync()
+        self.assertEqual(sorted(os.listdir(self.public)), ["images", "styles.css"])
+
+    def test_fingerprinted_path(self):
+        self.assertEqual(fingerprinted_path(os.path.join("css", "site.css"), "abcdef0123456789"), os.path.join("css", "site.abcdef0123.css"))
+
+
+if __name__ == "__main__":
+    unittest.main()
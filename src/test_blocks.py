@@ -0,0 +1,146 @@
+import unittest
+
+from blocks import markdown_to_html_node
+from cache import LRUCache
+from helpers import BlockType, iter_typed_blocks, markdown_to_blocks
+from links import page_links
+
+
+class TestBlockTypes(unittest.TestCase):
+    def types(self, md):
+        return [block_type for block_type, _ in iter_typed_blocks(md)]
+
+    def test_block_types(self):
+        md = """
+# Heading
+
+Plain paragraph
+over two lines
+
+> quoted
+> still quoted
+
+- one
+- two
+
+1. first
+2. second
+
+```
+code
+```
+"""
+        self.assertEqual(
+            self.types(md),
+            [
+                BlockType.HEADING,
+                BlockType.PARAGRAPH,
+                BlockType.QUOTE,
+                BlockType.UNORDERED_LIST,
+                BlockType.ORDERED_LIST,
+                BlockType.CODE,
+            ],
+        )
+
+    def test_mixed_lines_fall_back_to_paragraph(self):
+        self.assertEqual(self.types("> quote\nnot a quote"), [BlockType.PARAGRAPH])
+        self.assertEqual(self.types("- item\nnot an item"), [BlockType.PARAGRAPH])
+        self.assertEqual(self.types("1. one\n3. three"), [BlockType.PARAGRAPH])
+        self.assertEqual(self.types("2. starts at two"), [BlockType.PARAGRAPH])
+        self.assertEqual(self.types("####### seven"), [BlockType.PARAGRAPH])
+        self.assertEqual(self.types("#no space"), [BlockType.PARAGRAPH])
+
+    def test_fenced_code_keeps_blank_lines(self):
+        md = "Intro\n\n```\nfirst\n\n\nsecond\n```\n\nOutro"
+        self.assertEqual(markdown_to_blocks(md), ["Intro", "```\nfirst\n\n\nsecond\n```", "Outro"])
+
+    def test_fence_interrupts_paragraph(self):
+        md = "Intro\n```\ncode\n```\nOutro"
+        self.assertEqual(
+            list(iter_typed_blocks(md)),
+            [
+                (BlockType.PARAGRAPH, "Intro"),
+                (BlockType.CODE, "```\ncode\n```"),
+                (BlockType.PARAGRAPH, "Outro"),
+            ],
+        )
+
+    def test_unclosed_fence_runs_to_end(self):
+        self.assertEqual(list(iter_typed_blocks("```\ncode\n\nmore")), [(BlockType.CODE, "```\ncode\n\nmore")])
+
+
+class TestMarkdownToHTML(unittest.TestCase):
+    def test_paragraphs(self):
+        md = """
+This is **bolded** paragraph
+text in a p
+tag here
+
+This is another paragraph with _italic_ text and `code` here
+
+"""
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(
+            html,
+            "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p>"
+            "<p>This is another paragraph with <i>italic</i> text and <code>code</code> here</p></div>",
+        )
+
+    def test_codeblock(self):
+        md = """
+```
+This is text that _should_ remain
+the **same** even with inline stuff
+```
+"""
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(
+            html,
+            "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
+        )
+
+    def test_codeblock_with_blank_lines_and_info_string(self):
+        md = "```python\ndef f():\n\n    return 1\n```"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(html, "<div><pre><code>def f():\n\n    return 1\n</code></pre></div>")
+
+    def test_headings(self):
+        html = markdown_to_html_node("# One\n\n### Three with **bold**").to_html()
+        self.assertEqual(html, '<div><h1 id="one">One</h1><h3 id="three-with-bold">Three with <b>bold</b></h3></div>')
+
+    def test_empty_blocks(self):
+        self.assertEqual(markdown_to_html_node("# ").to_html(), "<div><h1></h1></div>")
+        self.assertEqual(
+            markdown_to_html_node("Intro\n\n## \n\ntext").to_html(),
+            "<div><p>Intro</p><h2></h2><p>text</p></div>",
+        )
+        self.assertEqual(markdown_to_html_node("1. a\n2. ").to_html(), "<div><ol><li>a</li><li></li></ol></div>")
+        self.assertEqual(markdown_to_html_node("- a\n- ").to_html(), "<div><ul><li>a</li><li></li></ul></div>")
+        self.assertEqual(page_links("Intro\n\n## \n\n# Title")["anchors"], ["title"])
+
+    def test_quote(self):
+        html = markdown_to_html_node("> quoted _text_\n>\n> more").to_html()
+        self.assertEqual(html, "<div><blockquote>quoted <i>text</i>  more</blockquote></div>")
+
+    def test_lists(self):
+        html = markdown_to_html_node("- a [link](/x)\n- **b**\n\n1. one\n2. two").to_html()
+        self.assertEqual(
+            html,
+            '<div><ul><li>a <a href="/x">link</a></li><li><b>b</b></li></ul>'
+            "<ol><li>one</li><li>two</li></ol></div>",
+        )
+
+    def test_escaping(self):
+        md = 'a < b && **c > "d"** [x](/q?a=1&b="2")\n\n```\nif a < b:\n```'
+        expected = (
+            '<div><p>a &lt; b &amp;&amp; <b>c &gt; "d"</b> <a href="/q?a=1&amp;b=&quot;2&quot;">x</a></p>'
+            "<pre><code>if a &lt; b:\n</code></pre></div>"
+        )
+        self.assertEqual(markdown_to_html_node(md).to_html(), expected)
+        inline_cache, block_cache = LRUCache(), LRUCache()
+        for _ in range(2):
+            self.assertEqual(markdown_to_html_node(md, inline_cache, block_cache).to_html(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,305 @@
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from build import (
+    PREFETCH_MAX_BYTES, PageError, build_site, extract_title, load_links, load_manifest, merge_shards, parse_shard,
+    render_pages, shard_of,
+)
+from template import Template
+
+
+TEMPLATE = "<html><title>{{ Title }}</title><body>{{ Content }}</body></html>"
+
+
+class TestBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.public = os.path.join(self.root, "public")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest = os.path.join(self.root, ".cache", "manifest.json")
+        self.write("template.html", TEMPLATE)
+        self.write("content/index.md", "# Home\n\nWelcome **home**\n")
+        self.write("content/blog/post.md", "# Post\n\nA [link](/)\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(os.path.join(self.root, path)) as f:
+            return f.read()
+
+    def build(self, force=False, **kwargs):
+        return build_site(self.content, self.template, self.public, self.manifest, force=force, **kwargs)
+
+    def test_extract_title(self):
+        self.assertEqual(extract_title("intro\n#  Hello  \n\ntext"), "Hello")
+        with self.assertRaises(ValueError):
+            extract_title("## not a title")
+
+    def test_build_renders_pages(self):
+        stats = self.build()
+        self.assertEqual((stats.rebuilt, stats.skipped, stats.deleted), (2, 0, 0))
+        self.assertEqual(
+            self.read("public/index.html"),
+            "<html><title>Home</title><body><div><h1 id=\"home\">Home</h1><p>Welcome <b>home</b></p></div></body></html>",
+        )
+        self.assertTrue(os.path.exists(os.path.join(self.public, "blog", "post.html")))
+
+    def test_rebuild_skips_unchanged_pages(self):
+        self.build()
+        stats = self.build()
+        self.assertEqual((stats.rebuilt, stats.skipped), (0, 2))
+
+    def test_rebuild_only_changed_page(self):
+        self.build()
+        self.write("content/blog/post.md", "# Post\n\nA fixed [link](/)\n")
+        stats = self.build()
+        self.assertEqual((stats.rebuilt, stats.skipped), (1, 1))
+        self.assertIn("A fixed", self.read("public/blog/post.html"))
+
+    def test_touch_without_change_skips(self):
+        self.build()
+        os.utime(os.path.join(self.content, "index.md"), ns=(0, 0))
+        stats = self.build()
+        self.assertEqual((stats.rebuilt, stats.skipped), (0, 2))
+
+    def test_template_change_rebuilds_everything(self):
+        self.build()
+        self.write("template.html", "<main>{{ Content }}</main>")
+        stats = self.build()
+        self.assertEqual((stats.rebuilt, stats.skipped), (2, 0))
+
+    def test_nav_lists_top_level_pages(self):
+        self.write("template.html", "{{ Nav }}|{{ Path }}")
+        self.write("content/blog/index.md", "# Blog\n")
+        self.build()
+        nav = '<nav><ul><li><a href="/blog/">Blog</a></li><li><a href="/">Home</a></li></ul></nav>'
+        self.assertEqual(self.read("public/index.html"), nav + "|/")
+        self.assertEqual(self.read("public/blog/post.html"), nav + "|/blog/post.html")
+
+    def test_title_is_escaped(self):
+        self.write("content/index.md", "# Fish & <Chips>\n")
+        self.build()
+        self.assertIn("<title>Fish &amp; &lt;Chips&gt;</title>", self.read("public/index.html"))
+
+    def test_nav_change_rebuilds_everything(self):
+        self.write("template.html", "{{ Nav }}{{ Content }}")
+        self.build()
+        self.write("content/blog/more.md", "# More\n")
+        stats = self.build()
+        self.assertEqual((stats.rebuilt, stats.skipped), (1, 2))
+        self.write("content/about.md", "# About\n")
+        stats = self.build()
+        self.assertEqual((stats.rebuilt, stats.skipped), (4, 0))
+        self.assertEqual(stats.reasons["blog/post.md"], "nav changed (via about.md)")
+        self.assertEqual(stats.reasons["about.md"], "new page")
+
+    def test_nav_only_tracks_titles(self):
+        self.write("template.html", "{{ Nav }}{{ Content }}")
+        self.build()
+        self.write("content/index.md", "# Home\n\nNew body\n")
+        stats = self.build()
+        self.assertEqual(stats.reasons, {"index.md": "source changed"})
+        self.write("content/index.md", "# Start\n\nNew body\n")
+        stats = self.build()
+        self.assertEqual(stats.reasons, {"index.md": "source changed", "blog/post.md": "nav changed (via index.md)"})
+
+    def test_pages_without_nav_ignore_it(self):
+        self.build()
+        self.write("content/about.md", "# About\n")
+        stats = self.build()
+        self.assertEqual(stats.reasons, {"about.md": "new page"})
+
+    def test_partial_change_rebuilds_everything(self):
+        self.write("template.html", "{{> partials/head.html }}{{ Content }}")
+        self.write("partials/head.html", "<header>v1</header>")
+        self.build()
+        self.assertEqual(self.read("public/blog/post.html")[:20], "<header>v1</header><")
+        self.write("partials/head.html", "<header>v2</header>")
+        stats = self.build()
+        self.assertEqual((stats.rebuilt, stats.skipped), (2, 0))
+        self.assertEqual(stats.reasons["index.md"], f"{os.path.join(self.root, 'partials', 'head.html')} changed")
+        self.assertIn("<header>v2</header>", self.read("public/index.html"))
+
+    def test_explain(self):
+        self.build()
+        os.remove(os.path.join(self.public, "index.html"))
+        self.write("content/blog/post.md", "# Post\n\nEdited\n")
+        stats = self.build()
+        self.assertEqual(stats.explain(), "  blog/post.md: source changed\n  index.md: output missing")
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        stats = self.build()
+        self.assertEqual((stats.rebuilt, stats.skipped, stats.deleted), (0, 1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog")))
+
+    def test_missing_output_is_rebuilt(self):
+        self.build()
+        os.remove(os.path.join(self.public, "index.html"))
+        stats = self.build()
+        self.assertEqual((stats.rebuilt, stats.skipped), (1, 1))
+
+    def test_force(self):
+        self.build()
+        stats = self.build(force=True)
+        self.assertEqual((stats.rebuilt, stats.skipped), (2, 0))
+
+    def test_parallel_build_matches_serial(self):
+        for i in range(12):
+            self.write(f"content/many/page{i}.md", f"# Page {i}\n\nBody _{i}_ with `code`\n")
+        self.build()
+        serial = {path: self.read(os.path.join("public", path)) for path in ["index.html", "many/page7.html"]}
+        stats = self.build(force=True, workers=2, chunksize=3)
+        self.assertEqual(stats.rebuilt, 14)
+        for path, html in serial.items():
+            self.assertEqual(self.read(os.path.join("public", path)), html)
+
+    def test_io_threads_match_serial(self):
+        for i in range(12):
+            self.write(f"content/many/page{i}.md", f"# Page {i}\n\nBody _{i}_ with `code`\n")
+        self.build()
+        serial = {path: self.read(os.path.join("public", path)) for path in ["index.html", "many/page7.html"]}
+        stats = self.build(force=True, io_threads=3)
+        self.assertEqual(stats.rebuilt, 14)
+        for path, html in serial.items():
+            self.assertEqual(self.read(os.path.join("public", path)), html)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.public, "many")))[0], "page0.html")
+
+    def test_io_threads_stream_large_pages(self):
+        # A page over PREFETCH_MAX_BYTES is not read whole: peak memory stays
+        # far below its size, as in a serial build.
+        paragraph = "Some **bold** text with a [link](/x) in it.\n\n"
+        self.write("content/big.md", "# Big\n\n" + paragraph * (4 * PREFETCH_MAX_BYTES // len(paragraph)))
+        source = os.path.join(self.content, "big.md")
+        dest = os.path.join(self.public, "big.html")
+        for io_threads in (0, 4):
+            with self.subTest(io_threads=io_threads):
+                tracemalloc.start()
+                render_pages([(source, dest, {})], Template(TEMPLATE), io_threads=io_threads)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self.assertLess(peak, PREFETCH_MAX_BYTES)
+                self.assertTrue(self.read("public/big.html").endswith("</body></html>"))
+
+
+    def test_asset_slots(self):
+        self.write("template.html", '<link href="{{ asset:css/site.css }}">' + TEMPLATE)
+        self.build()
+        self.assertIn('<link href="/css/site.css">', self.read("public/index.html"))
+        stats = self.build(assets={"css/site.css": "css/site.0123456789.css"})
+        self.assertEqual(stats.rebuilt, 2)
+        self.assertEqual(set(stats.reasons.values()), {"assets changed"})
+        self.assertIn('<link href="/css/site.0123456789.css">', self.read("public/blog/post.html"))
+        self.assertEqual(self.build(assets={"css/site.css": "css/site.0123456789.css", "other.js": "other.abc.js"}).rebuilt, 0)
+
+    def test_render_errors_name_the_page(self):
+        for i in range(4):
+            self.write(f"content/many/page{i}.md", f"# Page {i}\n\nfine\n")
+        self.write("content/many/page2.md", "# Broken\n\nan _unclosed italic\n")
+        bad = os.path.join(self.content, "many", "page2.md")
+        for kwargs in ({"io_threads": 0}, {"io_threads": 2}, {"workers": 2, "chunksize": 1}):
+            with self.subTest(**kwargs):
+                with self.assertRaises(PageError) as raised:
+                    self.build(force=True, **kwargs)
+                self.assertEqual(raised.exception.source_path, bad)
+                self.assertIn(bad, str(raised.exception))
+                self.assertIn("not closed", str(raised.exception))
+
+    def test_nav_title_errors_name_the_page(self):
+        self.write("template.html", "<header>{{ Nav }}</header>" + TEMPLATE)
+        self.write("content/about.md", "No heading here\n")
+        with self.assertRaises(PageError) as raised:
+            self.build()
+        self.assertEqual(raised.exception.source_path, os.path.join(self.content, "about.md"))
+        self.assertIn("no h1 header", str(raised.exception))
+
+    def tree(self, root):
+        files = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                with open(path, "rb") as f:
+                    files[os.path.relpath(path, root)] = f.read()
+        return files
+
+    def build_shards(self, count, **kwargs):
+        shards = []
+        for index in range(1, count + 1):
+            shard_dir = os.path.join(self.root, "shards", str(index))
+            dest, manifest = os.path.join(shard_dir, "public"), os.path.join(shard_dir, "manifest")
+            build_site(self.content, self.template, dest, manifest, shard=(index, count), **kwargs)
+            shards.append((dest, manifest))
+        return shards
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for text in ("0/4", "5/4", "x/4", "2"):
+            with self.assertRaises(ValueError):
+                parse_shard(text)
+
+    def test_shards_partition_pages(self):
+        pages = [os.path.join("section", f"page{i}.md") for i in range(200)]
+        counts = {}
+        for page in pages:
+            shard = shard_of(page, 4)
+            self.assertEqual(shard, shard_of(page, 4))
+            counts[shard] = counts.get(shard, 0) + 1
+        self.assertEqual(sorted(counts), [1, 2, 3, 4])
+        self.assertGreater(min(counts.values()), 20)
+
+    def test_merged_shards_match_single_build(self):
+        self.write("template.html", "<title>{{ Title }}</title>{{ Nav }}<main>{{ Content }}</main>")
+        for i in range(20):
+            self.write(f"content/many/page{i}.md", f"# Page {i}\n\n[next](/many/page{i + 1}) and [home](/)\n")
+        self.build()
+        single = self.tree(self.public)
+        merged_public = os.path.join(self.root, "merged")
+        merged_manifest = os.path.join(self.root, "merged-manifest")
+        stats = merge_shards(self.build_shards(3), merged_public, merged_manifest)
+        self.assertEqual((stats.shards, stats.pages, stats.copied), (3, 22, 22))
+        self.assertEqual(self.tree(merged_public), single)
+        self.assertEqual(load_manifest(merged_manifest).pages, load_manifest(self.manifest).pages)
+        self.assertEqual(load_links(merged_manifest), load_links(self.manifest))
+        # The merged manifest serves a later single-node build.
+        stats = build_site(self.content, self.template, merged_public, merged_manifest)
+        self.assertEqual((stats.rebuilt, stats.skipped), (0, 22))
+
+    def test_merge_copies_only_changed_pages(self):
+        merged = os.path.join(self.root, "merged")
+        manifest = os.path.join(self.root, "merged-manifest")
+        merge_shards(self.build_shards(2), merged, manifest)
+        self.write("content/blog/post.md", "# Post\n\nEdited\n")
+        os.remove(os.path.join(self.content, "index.md"))
+        stats = merge_shards(self.build_shards(2), merged, manifest)
+        self.assertEqual((stats.copied, stats.deleted), (1, 1))
+        self.assertIn("Edited", self.read("merged/blog/post.html"))
+        self.assertFalse(os.path.exists(os.path.join(merged, "index.html")))
+
+    def test_merge_rejects_incomplete_or_mismatched_shards(self):
+        shards = self.build_shards(3)
+        merged = os.path.join(self.root, "merged")
+        with self.assertRaises(ValueError):
+            merge_shards(shards[:2], merged, self.manifest)
+        with self.assertRaises(ValueError):
+            merge_shards([*shards, (self.public, self.manifest)], merged, self.manifest)
+        self.write("template.html", "<main>{{ Content }}</main>")
+        dest, manifest = shards[0]
+        build_site(self.content, self.template, dest, manifest, shard=(1, 3))
+        with self.assertRaises(ValueError):
+            merge_shards(shards, merged, self.manifest)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import os
+import tempfile
+import unittest
+
+from build import build_site
+from cache import LRUCache
+from blocks import block_cache_key, iter_html_nodes
+from helpers import BlockType, inline_to_html
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = LRUCache(max_entries=10)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", "<b>a</b>")
+        self.assertEqual(cache.get("a"), "<b>a</b>")
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (1, 1, 0))
+
+    def test_evicts_least_recently_used_entry(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "1")
+        self.assertEqual(cache.evictions, 1)
+
+    def test_byte_limit(self):
+        cache = LRUCache(max_bytes=10)
+        cache.put("a", "1234")
+        cache.put("b", "1234")
+        self.assertEqual(cache.size, 10)
+        cache.put("c", "1234")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.size, 10)
+        cache.put("too big", "0123456789")
+        self.assertIsNone(cache.get("too big"))
+
+    def test_replacing_entry_updates_size(self):
+        cache = LRUCache()
+        cache.put("a", "1234")
+        cache.put("a", "12")
+        self.assertEqual(cache.size, 3)
+
+    def test_save_and_load(self):
+        cache = LRUCache()
+        cache.put("a", "1")
+        cache.put("b", "2")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "inline.json")
+            cache.save(path)
+            loaded = LRUCache(max_entries=1)
+            loaded.load(path)
+            self.assertEqual(list(loaded.entries.items()), [("b", "2")])
+            empty = LRUCache()
+            empty.load(os.path.join(tmp, "missing.json"))
+            self.assertEqual(len(empty), 0)
+
+    def test_inline_to_html_uses_cache(self):
+        cache = LRUCache(max_entries=10)
+        text = "Footer with **bold** and a [link](/about)"
+        first = inline_to_html(text, cache)
+        second = inline_to_html(text, cache)
+        self.assertEqual(first, inline_to_html(text))
+        self.assertEqual(first, second)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_cached_page_matches_uncached(self):
+        md = "Same _footer_\n\nBody\n\nSame _footer_\n"
+        cache = LRUCache(max_entries=10)
+        cached = [node.to_html() for node in iter_html_nodes(md, cache)]
+        plain = [node.to_html() for node in iter_html_nodes(md)]
+        self.assertEqual(cached, plain)
+        self.assertEqual(cache.hits, 1)
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_block_cache_key(self):
+        paragraph = BlockType.PARAGRAPH
+        self.assertEqual(block_cache_key(paragraph, "same"), block_cache_key(paragraph, "same"))
+        self.assertNotEqual(block_cache_key(paragraph, "same"), block_cache_key(paragraph, "same."))
+        self.assertNotEqual(block_cache_key(paragraph, "same"), block_cache_key(BlockType.QUOTE, "same"))
+
+    def test_cached_blocks_match_uncached(self):
+        md = "# Title\n\nSome **bold** and [a link](/x)\n\nSome **bold** and [a link](/x)\n"
+        cache = LRUCache()
+        plain = [node.to_html() for node in iter_html_nodes(md)]
+        cold = [node.to_html() for node in iter_html_nodes(md, block_cache=cache)]
+        warm = [node.to_html() for node in iter_html_nodes(md, block_cache=cache)]
+        self.assertEqual(plain, cold)
+        self.assertEqual(plain, warm)
+        self.assertEqual((cache.hits, cache.misses), (4, 2))
+
+    def test_small_edit_only_renders_changed_block(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            os.makedirs(content)
+            template = os.path.join(root, "template.html")
+            with open(template, "w") as f:
+                f.write("{{ Content }}")
+            paragraphs = [f"Paragraph {i} with _italic_ text" for i in range(50)]
+            page = os.path.join(content, "handbook.md")
+
+            def build(cache):
+                with open(page, "w") as f:
+                    f.write("# Handbook\n\n" + "\n\n".join(paragraphs))
+                build_site(content, template, os.path.join(root, "public"), os.path.join(root, "manifest.json"), block_cache=cache)
+                with open(os.path.join(root, "public", "handbook.html")) as f:
+                    return f.read()
+
+            cache = LRUCache()
+            build(cache)
+            self.assertEqual((cache.hits, cache.misses), (0, 51))
+            paragraphs[20] = "Paragraph 20 with _edited_ text"
+            html = build(cache)
+            self.assertEqual((cache.hits, cache.misses), (50, 52))
+            self.assertIn("Paragraph 20 with <i>edited</i> text", html)
+
+
+    def test_worker_changes_are_merged(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            os.makedirs(content)
+            template = os.path.join(root, "template.html")
+            with open(template, "w") as f:
+                f.write("{{ Content }}")
+            for i in range(6):
+                with open(os.path.join(content, f"page{i}.md"), "w") as f:
+                    f.write(f"# Page {i}\n\nShared _footer_\n")
+
+            def build(workers, inline_cache, block_cache):
+                build_site(
+                    content, template, os.path.join(root, f"public{workers}"), os.path.join(root, f"manifest{workers}"),
+                    force=True, workers=workers, chunksize=1, inline_cache=inline_cache, block_cache=block_cache,
+                )
+                return inline_cache, block_cache
+
+            serial = build(1, LRUCache(), LRUCache())
+            inline_cache, block_cache = build(2, LRUCache(), LRUCache())
+            # Workers may each miss the shared footer, so only the entries and
+            # the number of block lookups must match the serial build.
+            self.assertEqual(dict(inline_cache.entries), dict(serial[0].entries))
+            self.assertEqual(dict(block_cache.entries), dict(serial[1].entries))
+            self.assertGreater(inline_cache.misses, 0)
+            self.assertEqual(block_cache.hits + block_cache.misses, 12)
+            misses = block_cache.misses
+            build(2, inline_cache, block_cache)
+            self.assertEqual(block_cache.misses, misses)
+            self.assertEqual(block_cache.hits + block_cache.misses, 24)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from corpus import generate_corpus, parse_mix
+from blocks import iter_html_nodes
+from helpers import markdown_to_blocks
+
+
+class TestCorpus(unittest.TestCase):
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("paragraph=6, code=0.5,quote"), {"paragraph": 6.0, "code": 0.5, "quote": 1.0})
+
+    def test_corpus_is_deterministic(self):
+        self.assertEqual(generate_corpus(5000, seed=3), generate_corpus(5000, seed=3))
+        self.assertNotEqual(generate_corpus(5000, seed=3), generate_corpus(5000, seed=4))
+
+    def test_corpus_size(self):
+        corpus = generate_corpus(20000)
+        self.assertGreaterEqual(len(corpus), 20000)
+        self.assertLess(len(corpus), 22000)
+
+    def test_feature_mix(self):
+        corpus = generate_corpus(5000, {"heading": 1}, {"plain": 1})
+        for block in markdown_to_blocks(corpus):
+            self.assertTrue(block.startswith("#"))
+        self.assertNotIn("**", corpus)
+
+    def test_corpus_renders(self):
+        for node in iter_html_nodes(generate_corpus(50000)):
+            node.to_html()
+
+    def test_unknown_feature(self):
+        with self.assertRaises(ValueError):
+            generate_corpus(100, {"table": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
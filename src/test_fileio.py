@@ -0,0 +1,133 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from fileio import Writer, atomic_write, file_state, prefetch, remove_output, write_text
+
+
+class TestAtomicWrite(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "out", "page.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self):
+        with open(self.path) as f:
+            return f.read()
+
+    def test_write(self):
+        with atomic_write(self.path) as f:
+            f.write("<p>new</p>")
+        self.assertEqual(self.read(), "<p>new</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["page.html"])
+
+    def test_failed_write_keeps_old_page(self):
+        with atomic_write(self.path) as f:
+            f.write("<p>old</p>")
+        with self.assertRaises(RuntimeError):
+            with atomic_write(self.path) as f:
+                f.write("<p>half")
+                raise RuntimeError("crash")
+        self.assertEqual(self.read(), "<p>old</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["page.html"])
+
+
+class TestFileState(unittest.TestCase):
+    def test_hash_is_reused_while_stat_is_unchanged(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "page.md")
+            with open(path, "w") as f:
+                f.write("one")
+            state = file_state(path)
+            self.assertEqual(state[0], 3)
+            # Any tuple starting with the state will do, e.g. a page entry.
+            self.assertEqual(file_state(path, state[:2] + ("recorded", "deps"))[2], "recorded")
+            with open(path, "w") as f:
+                f.write("three")
+            changed = file_state(path, state)
+            self.assertEqual(changed[0], 5)
+            self.assertNotEqual(changed[2], state[2])
+
+    def test_remove_output_prunes_empty_directories(self):
+        with tempfile.TemporaryDirectory() as root:
+            for name in ("a/b/page.html", "a/other.html"):
+                write_text(os.path.join(root, name), "<p></p>")
+            remove_output(root, os.path.join("a", "b", "page.html"))
+            self.assertEqual(os.listdir(os.path.join(root, "a")), ["other.html"])
+            remove_output(root, os.path.join("a", "other.html"))
+            self.assertEqual(os.listdir(root), [])
+
+
+class TestPrefetch(unittest.TestCase):
+    def test_order_and_bound(self):
+        with tempfile.TemporaryDirectory() as root:
+            paths = []
+            for i in range(20):
+                paths.append(os.path.join(root, f"{i}.md"))
+                with open(paths[-1], "w") as f:
+                    f.write(str(i))
+            started = []
+            texts = []
+
+            def key(path):
+                started.append(path)
+                return path
+
+            for path, text in prefetch(paths, key, threads=2, queue_size=3):
+                # The page being handed over plus at most queue_size ahead.
+                self.assertLessEqual(len(started) - len(texts), 1 + 3)
+                texts.append(text)
+            self.assertEqual(texts, [str(i) for i in range(20)])
+
+    def test_large_files_are_skipped(self):
+        with tempfile.TemporaryDirectory() as root:
+            paths = []
+            for size in (3, 10, 5):
+                paths.append(os.path.join(root, f"{size}.md"))
+                with open(paths[-1], "w") as f:
+                    f.write("x" * size)
+            texts = [text for _, text in prefetch(paths, lambda path: path, threads=2, max_size=5)]
+            self.assertEqual(texts, ["xxx", None, "xxxxx"])
+
+
+class TestWriter(unittest.TestCase):
+    def test_writes_pages(self):
+        with tempfile.TemporaryDirectory() as root:
+            with Writer(threads=2, queue_size=2) as writer:
+                for i in range(10):
+                    writer.submit(os.path.join(root, "pages", f"{i}.html"), f"page {i}")
+            for i in range(10):
+                with open(os.path.join(root, "pages", f"{i}.html")) as f:
+                    self.assertEqual(f.read(), f"page {i}")
+
+    def test_error_is_raised(self):
+        with tempfile.TemporaryDirectory() as root:
+            blocker = os.path.join(root, "file")
+            with open(blocker, "w") as f:
+                f.write("")
+            writer = Writer(threads=1)
+            writer.submit(os.path.join(blocker, "page.html"), "x")
+            with self.assertRaises(OSError):
+                writer.close()
+
+    def test_backpressure(self):
+        release = threading.Event()
+        writer = Writer(threads=1, queue_size=1)
+        with tempfile.TemporaryDirectory() as root:
+            writer.executor.submit(release.wait)
+            writer.submit(os.path.join(root, "a.html"), "a")
+            blocked = threading.Thread(target=writer.submit, args=(os.path.join(root, "b.html"), "b"))
+            blocked.start()
+            blocked.join(0.1)
+            self.assertTrue(blocked.is_alive())
+            release.set()
+            blocked.join(2)
+            self.assertFalse(blocked.is_alive())
+            writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
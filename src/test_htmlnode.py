@@ -2,7 +2,7 @@ import unittest
 import io
 import contextlib
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import FrozenProps, HTMLNode, LeafNode, ParentNode, RawNode, escape_attr, escape_text
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -29,6 +29,10 @@ class TestHTMLNode(unittest.TestCase):
         self.assertEqual(node.children, "children")
         self.assertEqual(node.props, {"href": "https://www.google.com", "target": "_blank"})
 
+    def test_slots(self):
+        for node in [HTMLNode("p"), LeafNode("p", "value"), ParentNode("div", [])]:
+            self.assertFalse(hasattr(node, "__dict__"))
+
     def test_leaf_to_html_p(self):
         node = LeafNode("p", "Hello, world!")
         self.assertEqual(node.to_html(), "<p>Hello, world!</p>")
@@ -68,12 +72,94 @@ class TestHTMLNode(unittest.TestCase):
             "<div><span><p><b>greatgrandchild</b></p></span></div>",
         )
 
-
-
-
-
-        
+    def test_iter_html(self):
+        parent_node = ParentNode("div", [LeafNode("b", "bold"), LeafNode(None, " text")])
+        self.assertEqual(list(parent_node.iter_html()), ["<div>", "<b>bold</b>", " text", "</div>"])
+
+    def test_write_html(self):
+        child_node = ParentNode("span", [LeafNode("b", "grandchild")])
+        parent_node = ParentNode("div", [child_node, LeafNode(None, "tail")])
+        with io.StringIO() as buf:
+            parent_node.write_html(buf)
+            self.assertEqual(buf.getvalue(), parent_node.to_html())
+            self.assertEqual(buf.getvalue(), "<div><span><b>grandchild</b></span>tail</div>")
+
+    def test_to_html_no_children(self):
+        with self.assertRaises(ValueError):
+            ParentNode("div", None).to_html()
+
+    def deep_tree(self, depth):
+        node = LeafNode("b", "deep")
+        for _ in range(depth):
+            node = ParentNode("div", [LeafNode(None, "a"), node, LeafNode(None, "z")])
+        return node
+
+    def test_to_html_deep_nesting(self):
+        depth = 20000
+        html = self.deep_tree(depth).to_html()
+        self.assertEqual(html, "<div>a" * depth + "<b>deep</b>" + "z</div>" * depth)
+
+    def test_write_html_deep_nesting(self):
+        depth = 10000
+        node = self.deep_tree(depth)
+        with io.StringIO() as buf:
+            node.write_html(buf)
+            self.assertEqual(buf.getvalue(), node.to_html())
+
+    def test_deep_nesting_invalid_child(self):
+        node = self.deep_tree(10000)
+        node.children[1].children[1].children = None
+        with self.assertRaises(ValueError):
+            node.to_html()
+
+    def test_to_html_custom_child_node(self):
+        class Comment(HTMLNode):
+            def iter_html(self):
+                yield f"<!-- {self.value} -->"
+
+        parent_node = ParentNode("div", [Comment(value="note"), ParentNode("p", [])])
+        self.assertEqual(parent_node.to_html(), "<div><!-- note --><p></p></div>")
+
+    def test_html_node_to_html_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            HTMLNode("p", "value").to_html()
+
+
+class TestEscaping(unittest.TestCase):
+    def test_escape_text(self):
+        self.assertEqual(escape_text("plain text"), "plain text")
+        self.assertEqual(escape_text('a < b & c > "d"'), 'a &lt; b &amp; c &gt; "d"')
+        self.assertEqual(escape_text("&lt;"), "&amp;lt;")
+
+    def test_escape_attr(self):
+        self.assertEqual(escape_attr("/x?y=1"), "/x?y=1")
+        self.assertEqual(escape_attr('/x?a=1&b="2"'), "/x?a=1&amp;b=&quot;2&quot;")
+
+    def test_non_string_props_and_values(self):
+        self.assertEqual(LeafNode("img", "", {"width": 100, "alt": None}).to_html(), '<img width="100" alt="None"></img>')
+        self.assertEqual(LeafNode("b", 42).to_html(), "<b>42</b>")
+        self.assertEqual(FrozenProps(width=100).html, ' width="100"')
+
+    def test_leaf_escapes_value_and_props(self):
+        node = LeafNode("a", "<b> & co", {"href": '/q?a=1&b="<2>"'})
+        self.assertEqual(node.to_html(), '<a href="/q?a=1&amp;b=&quot;&lt;2&gt;&quot;">&lt;b&gt; &amp; co</a>')
+        self.assertEqual(LeafNode(None, "1 < 2").to_html(), "1 &lt; 2")
+
+    def test_raw_node(self):
+        node = ParentNode("div", [RawNode("<b>cached</b>"), LeafNode(None, "<raw>")])
+        self.assertEqual(node.to_html(), "<div><b>cached</b>&lt;raw&gt;</div>")
+
+    def test_frozen_props(self):
+        props = FrozenProps({"class": "note", "title": 'say "hi"'})
+        self.assertEqual(props.html, ' class="note" title="say &quot;hi&quot;"')
+        self.assertEqual(LeafNode("span", "x", props).to_html(), '<span class="note" title="say &quot;hi&quot;">x</span>')
+        with self.assertRaises(TypeError):
+            props["class"] = "other"
+
+    def test_parent_props(self):
+        node = ParentNode("div", [LeafNode(None, "x")], {"class": "a&b"})
+        self.assertEqual(node.to_html(), '<div class="a&amp;b">x</div>')
 
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+from build import build_site, load_links
+from links import LinkIndex, page_links, resolve
+
+
+def entry(output, links=(), images=(), anchors=()):
+    return (output, list(links), list(images), list(anchors))
+
+
+class TestPageLinks(unittest.TestCase):
+    def test_page_links(self):
+        md = (
+            "# Getting Started\n\nSee [docs](/docs/) and ![logo](/logo.png).\n\n"
+            "```\n[not](/a/link)\n```\n\n## Next, **steps**\n\n- [more](more.html#top)\n"
+        )
+        self.assertEqual(
+            page_links(md),
+            {"links": ["/docs/", "more.html#top"], "images": ["/logo.png"], "anchors": ["getting-started", "next-steps"]},
+        )
+
+    def test_code_spans_are_not_links(self):
+        md = "Use `[text](missing-page)` or **see [this](/this)**\n\n> `![a](/a.png)` and ![b](/b.png)\n"
+        self.assertEqual(page_links(md), {"links": ["/this"], "images": ["/b.png"], "anchors": []})
+
+
+class TestResolve(unittest.TestCase):
+    def test_resolve(self):
+        self.assertEqual(resolve("/blog/post.html", "other.html"), ("/blog/other.html", ""))
+        self.assertEqual(resolve("/blog/post.html", "../about#team"), ("/about", "team"))
+        self.assertEqual(resolve("/blog/index.html", "/"), ("/index.html", ""))
+        self.assertEqual(resolve("/blog/index.html", "./"), ("/blog/index.html", ""))
+        self.assertEqual(resolve("/blog/post.html", "#intro"), ("/blog/post.html", "intro"))
+        self.assertEqual(resolve("/blog/post.html", "/search?q=x"), ("/search", ""))
+
+
+class TestLinkIndex(unittest.TestCase):
+    def setUp(self):
+        pages = {
+            "index.md": entry("index.html", ["/blog/", "/about", "https://example.com", "/blog/post#usage"], ["/logo.png"]),
+            "about.md": entry("about.html", ["/", "#team", "/blog/post.html#missing"], anchors=["team"]),
+            "blog/index.md": entry(os.path.join("blog", "index.html"), ["post.html", "gone.html"], ["../missing.png"]),
+            "blog/post.md": entry(os.path.join("blog", "post.html"), ["../about.html#nope"], anchors=["usage"]),
+        }
+        self.index = LinkIndex.from_entries(pages, {"logo.png": {"output": "logo.png"}})
+
+    def test_check(self):
+        self.assertEqual(
+            sorted(self.index.check()),
+            [
+                ("about.md", "/blog/post.html#missing", "missing anchor"),
+                ("blog/index.md", "../missing.png", "missing image"),
+                ("blog/index.md", "gone.html", "missing page"),
+                ("blog/post.md", "../about.html#nope", "missing anchor"),
+            ],
+        )
+
+    def test_linked_from(self):
+        self.assertEqual(self.index.linked_from(["about.html"]), {"index.md", "blog/post.md"})
+        self.assertEqual(self.index.linked_from([os.path.join("blog", "index.html")]), {"index.md"})
+        self.assertEqual(self.index.linked_from(["logo.png"]), {"index.md"})
+
+
+class TestBuildIndex(unittest.TestCase):
+    def test_manifest_links(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            os.makedirs(content)
+            with open(os.path.join(content, "index.md"), "w") as f:
+                f.write("# Home\n\n[about](/about#who) [broken](/nowhere)\n")
+            with open(os.path.join(content, "about.md"), "w") as f:
+                f.write("# About\n\n## Who\n")
+            template = os.path.join(root, "template.html")
+            with open(template, "w") as f:
+                f.write("{{ Content }}")
+            manifest = os.path.join(root, "manifest.json")
+            build_site(content, template, os.path.join(root, "public"), manifest)
+            build_site(content, template, os.path.join(root, "public"), manifest)
+            pages = load_links(manifest)
+            self.assertEqual(pages["about.md"], ("about.html", [], [], ["about", "who"]))
+            self.assertEqual(LinkIndex.from_entries(pages).check(), [("index.md", "/nowhere", "missing page")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import main
+
+SRC = os.path.dirname(os.path.abspath(__file__))
+HEAVY = ["blocks", "helpers", "links", "profiling", "concurrent.futures", "multiprocessing", "tempfile"]
+
+# Runs main.main(argv) in a fresh interpreter and prints which of the heavy
+# modules it ended up importing.
+PROBE = f"""
+import contextlib, io, sys
+sys.path.insert(0, {SRC!r})
+import main
+with contextlib.redirect_stdout(io.StringIO()):
+    try:
+        main.main(sys.argv[1:])
+    except SystemExit:
+        pass
+print(",".join(name for name in {HEAVY!r} if name in sys.modules))
+"""
+
+
+class TestStartup(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "content"))
+        os.makedirs(os.path.join(self.root, "static"))
+        with open(os.path.join(self.root, "content", "index.md"), "w") as f:
+            f.write("# Home\n\nHello **there**\n")
+        with open(os.path.join(self.root, "template.html"), "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Nav }}{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def imported(self, *argv):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE, *argv], cwd=self.root, capture_output=True, text=True, check=True,
+        )
+        return result.stdout.strip().split(",") if result.stdout.strip() else []
+
+    def test_help_imports_nothing_heavy(self):
+        self.assertEqual(self.imported("--help"), [])
+
+    def test_noop_build_skips_the_pipeline(self):
+        self.assertIn("blocks", self.imported("build"))
+        self.assertEqual(self.imported("build"), [])
+        with open(os.path.join(self.root, "public", "index.html")) as f:
+            self.assertIn("<b>there</b>", f.read())
+
+
+class TestShards(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "static"))
+        with open(os.path.join(self.root, "static", "site.css"), "w") as f:
+            f.write("body {}")
+        with open(os.path.join(self.root, "template.html"), "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Nav }}{{ Content }}")
+        for i in range(10):
+            os.makedirs(os.path.join(self.root, "content", f"part{i % 3}"), exist_ok=True)
+            with open(os.path.join(self.root, "content", f"part{i % 3}", f"page{i}.md"), "w") as f:
+                f.write(f"# Page {i}\n\nSee [page 0](/part0/page0) and [gone](/missing{i % 2})\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_main(self, *argv):
+        return subprocess.run(
+            [sys.executable, os.path.join(SRC, "main.py"), *argv], cwd=self.root, capture_output=True, text=True,
+        )
+
+    def tree(self, root):
+        files = {}
+        for directory, _, names in os.walk(os.path.join(self.root, root)):
+            for name in names:
+                path = os.path.join(directory, name)
+                with open(path, "rb") as f:
+                    files[os.path.relpath(path, self.root).split(os.sep, 1)[1]] = f.read()
+        return files
+
+    def test_shard_processes_merge_to_single_build(self):
+        shards = [subprocess.Popen(
+            [sys.executable, os.path.join(SRC, "main.py"), "build", "--shard", f"{i}/3", "--shard-dir", f"shard{i}"],
+            cwd=self.root, stdout=subprocess.DEVNULL,
+        ) for i in range(1, 4)]
+        self.assertEqual([shard.wait() for shard in shards], [0, 0, 0])
+        merged = self.run_main("merge", "shard1", "shard2", "shard3")
+        # The cross-shard check finds the links to /missing1 and /missing0.
+        self.assertEqual(merged.returncode, 1)
+        self.assertIn("10 pages: 10 broken links", merged.stdout)
+        os.rename(os.path.join(self.root, "public"), os.path.join(self.root, "merged"))
+        self.run_main("build", "--force")
+        self.assertEqual(self.tree("merged"), self.tree("public"))
+
+    def test_fingerprinted_assets_are_linked(self):
+        with open(os.path.join(self.root, "template.html"), "w") as f:
+            f.write('<link href="{{ asset:site.css }}">{{ Content }}')
+        self.assertEqual(self.run_main("build", "--fingerprint").returncode, 0)
+        with open(os.path.join(self.root, "public", "assets.json")) as f:
+            output = json.load(f)["site.css"]
+        self.assertTrue(os.path.exists(os.path.join(self.root, "public", output)))
+        with open(os.path.join(self.root, "public", "part0", "page0.html")) as f:
+            self.assertIn(f'<link href="/{output}">', f.read())
+
+    def test_merge_reports_missing_shard(self):
+        self.assertEqual(self.run_main("build", "--shard", "1/2", "--shard-dir", "shard1").returncode, 0)
+        merged = self.run_main("merge", "shard1")
+        self.assertEqual(merged.returncode, 2)
+        self.assertIn("expected shards 1/2..2/2", merged.stderr)
+
+
+class TestWatchRebuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "content"))
+        os.makedirs(os.path.join(self.root, "static"))
+        self.write("# Home\n\nHello **there**\n")
+        with open(os.path.join(self.root, "template.html"), "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        self.cwd = os.getcwd()
+        os.chdir(self.root)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def write(self, text):
+        with open(os.path.join(self.root, "content", "index.md"), "w") as f:
+            f.write(text)
+
+    def test_failed_rebuild_keeps_watching(self):
+        args = argparse.Namespace(
+            io_threads=0, no_search_index=False, explain=False, force=False,
+            static_workers=1, link_static=False, fingerprint=False,
+        )
+        state = types.SimpleNamespace(generation=0)
+        out, err = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            self.assertTrue(main.rebuild_after_change(args, state, {"index.md"}))
+            self.write("# Home\n\nHello _there\n")
+            self.assertFalse(main.rebuild_after_change(args, state, {"index.md"}))
+            self.assertEqual(state.generation, 1)
+            self.assertIn(os.path.join("content", "index.md"), err.getvalue())
+            self.assertIn("not closed", err.getvalue())
+            self.write("# Home\n\nHello _there_\n")
+            self.assertTrue(main.rebuild_after_change(args, state, {"index.md"}))
+        self.assertEqual(state.generation, 2)
+        with open(os.path.join(self.root, "public", "index.html")) as f:
+            self.assertIn("<i>there</i>", f.read())
+
+
+    def test_failed_first_build_still_watches(self):
+        with open(os.path.join(self.root, "template.html"), "w") as f:
+            f.write("{{> partials/missing.html }}{{ Content }}")
+        err = io.StringIO()
+        with mock.patch.object(main, "watch_and_serve") as watch, contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(err):
+            self.assertEqual(main.main(["watch"]), 0)
+        watch.assert_called_once()
+        self.assertIn("build failed:", err.getvalue())
+        self.assertIn("missing.html", err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import contextlib
+import gc
+import signal
+import time
+import unittest
+
+from blocks import markdown_to_html_node
+from corpus import PATHOLOGICAL_BLOCKS, PATHOLOGICAL_INLINE, fuzz_markdown, pathological, pathological_block
+from helpers import split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
+from links import page_links, scan_page
+from textnode import TextNode, TextType
+
+# Parsing time must grow at most linearly: at GROWTH times the input it may
+# take at most MAX_RATIO times as long (linear is GROWTH, quadratic would be
+# GROWTH ** 2, so the tolerance absorbs timer noise and cache effects on
+# large strings). Time is the process's CPU time, so other busy processes
+# do not count against the parser, and inputs start small and double until
+# a parse takes MIN_SECONDS, long enough that one scheduler slice cannot
+# dominate it. A ratio over the limit is measured once more before failing.
+# Any single parse over TIME_LIMIT seconds of wall-clock time fails
+# outright, which catches catastrophic regex backtracking instead of
+# hanging the suite.
+GROWTH = 8
+MAX_RATIO = 20
+MIN_SECONDS = 0.02
+START_SIZE = 2000
+MAX_SIZE = 2_000_000
+TIME_LIMIT = 5
+
+
+def chained_split(text):
+    # The split_nodes_* passes in the order the original pipeline ran them.
+    nodes = split_nodes_link([TextNode(text, TextType.TEXT)])
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    return split_nodes_delimiter(nodes, "**", TextType.BOLD)
+
+
+def render(markdown):
+    return markdown_to_html_node(markdown).to_html()
+
+
+INLINE_PARSERS = {"text_to_textnodes": text_to_textnodes, "split_nodes": chained_split, "render": render}
+BLOCK_PARSERS = {"render": render, "page_links": page_links}
+FUZZ_PARSERS = {**INLINE_PARSERS, "page_links": page_links, "page_terms": lambda text: scan_page(text, terms=True)}
+
+
+@contextlib.contextmanager
+def time_limit(seconds):
+    def expire(signum, frame):
+        raise AssertionError(f"parse took longer than {seconds}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def quadratic_split_links(text):
+    # The shape of the old split-on-literal loop, which copied the rest of
+    # the text for every link: the tests must catch this.
+    nodes = []
+    while "](" in text:
+        before, _, text = text.partition("](")
+        nodes.append(before)
+    return nodes
+
+
+def parse_time(parse, text):
+    # Invalid markdown may be rejected with ValueError, which must be just
+    # as fast. The collector is paused while timing.
+    gc.disable()
+    try:
+        start = time.process_time()
+        with time_limit(TIME_LIMIT):
+            try:
+                parse(text)
+            except ValueError:
+                pass
+        return time.process_time() - start
+    finally:
+        gc.enable()
+
+
+def growth_ratio(parse, small_text, large_text, repeat=2):
+    # Best of repeat runs each, alternating so a slow patch on the machine
+    # hits both sizes.
+    gc.collect()
+    small = large = None
+    for _ in range(repeat):
+        elapsed = parse_time(parse, small_text)
+        small = elapsed if small is None else min(small, elapsed)
+        elapsed = parse_time(parse, large_text)
+        large = elapsed if large is None else min(large, elapsed)
+    return large / max(small, 1e-9), small, large
+
+
+@unittest.skipUnless(hasattr(signal, "setitimer"), "needs signal.setitimer")
+class TestLinearTime(unittest.TestCase):
+    def assertLinear(self, parse, generate):
+        size = START_SIZE
+        text = generate(size)
+        while parse_time(parse, text) < MIN_SECONDS and size * GROWTH < MAX_SIZE:
+            size *= 2
+            text = generate(size)
+        large_text = generate(size * GROWTH)
+        ratio, small, large = growth_ratio(parse, text, large_text)
+        if ratio >= MAX_RATIO:
+            ratio, small, large = growth_ratio(parse, text, large_text)
+        self.assertLess(
+            ratio, MAX_RATIO,
+            f"{GROWTH}x the input ({size} -> {size * GROWTH} chars) took {ratio:.1f}x as long "
+            f"({small * 1000:.2f} -> {large * 1000:.2f} ms)",
+        )
+
+    def test_detects_quadratic_parsing(self):
+        with self.assertRaises(AssertionError):
+            self.assertLinear(quadratic_split_links, lambda size: pathological(PATHOLOGICAL_INLINE["identical_links"], size))
+
+    def test_inline(self):
+        for name, unit in PATHOLOGICAL_INLINE.items():
+            for parser, parse in INLINE_PARSERS.items():
+                with self.subTest(input=name, parser=parser):
+                    self.assertLinear(parse, lambda size: pathological(unit, size))
+
+    def test_blocks(self):
+        for name in PATHOLOGICAL_BLOCKS:
+            for parser, parse in BLOCK_PARSERS.items():
+                with self.subTest(input=name, parser=parser):
+                    self.assertLinear(parse, lambda size: pathological_block(name, size))
+
+    def test_fuzz(self):
+        for seed in range(3):
+            for parser, parse in FUZZ_PARSERS.items():
+                with self.subTest(seed=seed, parser=parser):
+                    self.assertLinear(parse, lambda size: fuzz_markdown(size, seed))
+
+
+class TestPathologicalInputs(unittest.TestCase):
+    def test_generators(self):
+        self.assertEqual(pathological("[a](", 10), "[a]([a](")
+        self.assertEqual(pathological_block("ordered_list", 20), "1. item\n2. item\n3. item\n")
+        self.assertEqual(fuzz_markdown(500, seed=1), fuzz_markdown(500, seed=1))
+        self.assertGreaterEqual(len(fuzz_markdown(500)), 500)
+
+    def test_output_is_unchanged(self):
+        # Degenerate input still renders the way ordinary input does.
+        self.assertEqual(render(pathological("[link](/same) ", 28)), '<div><p><a href="/same">link</a> <a href="/same">link</a></p></div>')
+        with self.assertRaises(ValueError):
+            text_to_textnodes(pathological("a_ ", 9))
+
+
+if __name__ == "__main__":
+    unittest.main()
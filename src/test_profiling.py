@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import unittest
+
+from build import build_site
+from profiling import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        os.makedirs(self.content)
+        self.template = os.path.join(self.root, "template.html")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        for i, paragraphs in enumerate([1, 50, 5]):
+            with open(os.path.join(self.content, f"page{i}.md"), "w") as f:
+                f.write(f"# Page {i}\n\n" + "Some **bold** text\n\n" * paragraphs)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, profiler, dest="public", **kwargs):
+        return build_site(
+            self.content, self.template, os.path.join(self.root, dest),
+            os.path.join(self.root, dest + ".json"), profiler=profiler, **kwargs
+        )
+
+    def test_records_pages_and_stages(self):
+        profiler = Profiler()
+        self.build(profiler)
+        self.assertEqual(len(profiler.pages), 3)
+        page = profiler.pages[os.path.join(self.content, "page1.md")]
+        self.assertEqual(page["stages"]["markdown_to_blocks"]["nodes"], 51)
+        self.assertEqual(page["stages"]["block_to_html_node"]["nodes"], 51 + 50 * 2)
+        self.assertIsNone(page["peak_bytes"])
+        totals = profiler.stage_totals()
+        self.assertEqual(totals["write_html"]["calls"], 1 + 1 + 51 + 6)
+
+    def test_profiled_output_matches_plain_build(self):
+        self.build(None, "plain")
+        self.build(Profiler(trace_allocations=True), "profiled")
+        for i in range(3):
+            with open(os.path.join(self.root, "plain", f"page{i}.html")) as plain:
+                with open(os.path.join(self.root, "profiled", f"page{i}.html")) as profiled:
+                    self.assertEqual(plain.read(), profiled.read())
+
+    def test_report_sorted_by_time(self):
+        profiler = Profiler()
+        profiler.merge({
+            "fast.md": {"start": 0.0, "seconds": 0.001, "pid": 1, "stages": {}, "peak_bytes": None},
+            "slow.md": {"start": 0.0, "seconds": 0.5, "pid": 1, "stages": {}, "peak_bytes": None},
+        })
+        report = profiler.report()
+        self.assertLess(report.index("slow.md"), report.index("fast.md"))
+        self.assertIn("slowest stages:", report)
+
+    def test_allocations(self):
+        profiler = Profiler(trace_allocations=True)
+        self.build(profiler)
+        for record in profiler.pages.values():
+            self.assertGreater(record["peak_bytes"], 0)
+
+    def test_parallel_build_merges_worker_profiles(self):
+        profiler = Profiler()
+        self.build(profiler, workers=2, chunksize=1)
+        self.assertEqual(len(profiler.pages), 3)
+        pids = {record["pid"] for record in profiler.pages.values()}
+        self.assertNotIn(os.getpid(), pids)
+
+    def test_chrome_trace(self):
+        profiler = Profiler()
+        self.build(profiler)
+        path = os.path.join(self.root, "trace", "build.json")
+        profiler.write_chrome_trace(path)
+        with open(path) as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual(len(events), 3)
+        self.assertEqual({event["ph"] for event in events}, {"X"})
+        self.assertIn("block_to_html_node", events[0]["args"])
+
+
+if __name__ == "__main__":
+    unittest.main()
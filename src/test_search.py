@@ -0,0 +1,148 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from build import build_site
+from helpers import iter_typed_blocks, text_to_textnodes
+from links import scan_page
+from search import SearchIndex, tokenize
+
+
+PAGE = """# Getting Started
+
+Install the **package**, then read the [install guide](/docs/install-guide.html).
+
+- Run `make install`
+- ![Install diagram](https://example.com/img/install.png)
+"""
+
+
+class TestTokenize(unittest.TestCase):
+    def test_words(self):
+        self.assertEqual(tokenize("Hello, **World**! snake_case a"), ["hello", "world", "snake", "case"])
+
+    def test_accents_are_folded(self):
+        self.assertEqual(tokenize("Café DÉJÀ vu Straße"), ["cafe", "deja", "vu", "strasse"])
+
+    def test_page_terms_match_text_nodes(self):
+        expected = {}
+        for _, block in iter_typed_blocks(PAGE):
+            for node in text_to_textnodes(block):
+                for word in tokenize(node.text):
+                    expected[word] = expected.get(word, 0) + 1
+        terms = scan_page(PAGE, terms=True).terms
+        self.assertEqual(terms, expected)
+        self.assertEqual(terms["install"], 4)
+        self.assertNotIn("docs", terms)
+        self.assertNotIn("example", terms)
+
+    def test_code_blocks_are_not_indexed(self):
+        terms = scan_page("# Setup\n\n```python\nimport secrets\n```\n\n1. First\n2. Second _step_\n", terms=True).terms
+        self.assertEqual(terms, {"setup": 1, "first": 1, "second": 1, "step": 1})
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex.from_pages({
+            "a.md": ("/a.html", "A", {"python": 3, "guide": 1}),
+            "b.md": ("/b.html", "B", {"python": 1}),
+            "c.md": ("/c.html", "C", {"python": 1, "guide": 4}),
+        })
+
+    def test_postings_are_delta_encoded(self):
+        data = json.loads(self.index.to_json())
+        self.assertEqual(data["pages"], [["/a.html", "A"], ["/b.html", "B"], ["/c.html", "C"]])
+        self.assertEqual(data["terms"], {"guide": [0, 1, 2, 4], "python": [0, 3, 1, 1, 1, 1]})
+
+    def test_round_trip(self):
+        loaded = SearchIndex.from_json(self.index.to_json())
+        self.assertEqual(loaded.pages, self.index.pages)
+        self.assertEqual(loaded.terms, self.index.terms)
+
+    def test_search_ranks_pages_with_every_word(self):
+        self.assertEqual([url for url, _, _ in self.index.search("Python")], ["/a.html", "/b.html", "/c.html"])
+        self.assertEqual([url for url, _, _ in self.index.search("python GUIDE")], ["/c.html", "/a.html"])
+        self.assertEqual(self.index.search("python missing"), [])
+        self.assertEqual(self.index.search("?!"), [])
+
+
+class TestBuildIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.public = os.path.join(self.root, "public")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest = os.path.join(self.root, ".cache", "manifest")
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("content/index.md", "# Home\n\nWelcome to the site\n")
+        self.write("content/docs/start.md", PAGE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self):
+        return build_site(self.content, self.template, self.public, self.manifest)
+
+    def search(self, query):
+        return SearchIndex.load(os.path.join(self.public, "search.json")).search(query)
+
+    def test_build_writes_index(self):
+        stats = self.build()
+        self.assertEqual((stats.search.indexed, stats.search.pages), (2, 2))
+        self.assertGreater(stats.search.bytes, 0)
+        self.assertEqual([result[:2] for result in self.search("install")], [("/docs/start.html", "Getting Started")])
+
+    def test_only_changed_pages_are_reindexed(self):
+        self.build()
+        self.assertIsNone(self.build().search)
+        self.write("content/index.md", "# Home\n\nNow with install notes\n")
+        stats = self.build()
+        self.assertEqual((stats.search.indexed, stats.search.pages), (1, 2))
+        self.assertEqual({url for url, _, _ in self.search("install")}, {"/", "/docs/start.html"})
+        os.remove(os.path.join(self.content, "docs", "start.md"))
+        stats = self.build()
+        self.assertEqual((stats.search.indexed, stats.search.pages), (0, 1))
+        self.assertEqual([url for url, _, _ in self.search("install")], ["/"])
+
+    def test_changed_page_is_indexed_while_rendering(self):
+        self.build()
+        self.write("content/docs/start.md", PAGE + "\nMore notes\n")
+        source = os.path.join(self.content, "docs", "start.md")
+        opened = []
+        real_open = open
+
+        def counting_open(path, *args, **kwargs):
+            if path == source:
+                opened.append(path)
+            return real_open(path, *args, **kwargs)
+
+        with mock.patch("builtins.open", counting_open):
+            self.build()
+        # Hashing, the title and the rendered content; links and terms come
+        # from the render pass.
+        self.assertEqual(len(opened), 3)
+        self.assertEqual([url for url, _, _ in self.search("notes")], ["/docs/start.html"])
+
+    def test_missing_index_is_rewritten(self):
+        self.build()
+        os.remove(os.path.join(self.public, "search.json"))
+        self.assertEqual(self.build().search.indexed, 0)
+        self.assertTrue(self.search("welcome"))
+
+    def test_disabled(self):
+        stats = build_site(self.content, self.template, self.public, self.manifest, search_index=False)
+        self.assertIsNone(stats.search)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "search.json")))
+
+
+if __name__ == "__main__":
+    unittest.main()
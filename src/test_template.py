@@ -0,0 +1,80 @@
+import io
+import os
+import tempfile
+import unittest
+
+from template import Template, load_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_parse(self):
+        template = Template("<title>{{ Title }}</title>{{Content}}!")
+        self.assertEqual(template.slots, ["Title", "Content"])
+        self.assertEqual(template.literals, ["<title>", "</title>", "!"])
+
+    def test_asset_slot(self):
+        template = Template('<link href="{{ asset:css/site-2.css }}">{{ Title.x }}')
+        self.assertEqual(template.slots, ["asset:css/site-2.css"])
+        self.assertEqual(template.render({"asset:css/site-2.css": "/css/site-2.abc.css"}), '<link href="/css/site-2.abc.css">{{ Title.x }}')
+
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": "<p>hi</p>"}),
+            "<title>Home</title><main><p>hi</p></main>",
+        )
+
+    def test_missing_value_renders_empty(self):
+        self.assertEqual(Template("a{{ Nav }}b").render({}), "ab")
+
+    def test_slot_repeated(self):
+        self.assertEqual(Template("{{ Title }} - {{ Title }}").render({"Title": "x"}), "x - x")
+
+    def test_no_slots(self):
+        self.assertEqual(Template("plain").render({"Title": "x"}), "plain")
+
+    def test_write_with_callable(self):
+        out = io.StringIO()
+        Template("<main>{{ Content }}</main>{{ Title }}").write(out, {"Content": lambda s: s.write("<p>streamed</p>"), "Title": "t"})
+        self.assertEqual(out.getvalue(), "<main><p>streamed</p></main>t")
+
+    def test_load_template_reloads_on_change(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "template.html")
+            with open(path, "w") as f:
+                f.write("<a>{{ Content }}</a>")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+            with open(path, "w") as f:
+                f.write("<b>{{ Content }}</b>!")
+            second = load_template(path)
+            self.assertIsNot(second, first)
+            self.assertEqual(second.render({"Content": "x"}), "<b>x</b>!")
+
+    def test_partials(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "template.html")
+            head = os.path.join(root, "partials", "head.html")
+            os.makedirs(os.path.dirname(head))
+            with open(path, "w") as f:
+                f.write("{{> partials/head.html }}<main>{{ Content }}</main>")
+            with open(head, "w") as f:
+                f.write("<title>{{ Title }}</title>")
+            template = load_template(path)
+            self.assertEqual(template.dependencies, sorted([path, head]))
+            self.assertEqual(template.render({"Title": "t", "Content": "c"}), "<title>t</title><main>c</main>")
+            with open(head, "w") as f:
+                f.write("<h1>{{ Title }}</h1>!")
+            self.assertEqual(load_template(path).render({"Title": "t"}), "<h1>t</h1>!<main></main>")
+
+    def test_partial_cycle(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "template.html")
+            with open(path, "w") as f:
+                f.write("{{> template.html }}")
+            with self.assertRaises(ValueError):
+                load_template(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
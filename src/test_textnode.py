@@ -1,7 +1,11 @@
+import io
+import pickle
+import tracemalloc
 import unittest
 
-from textnode import TextNode, TextType, text_node_to_html_node
-from helpers import type_to_delim, split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_link, split_nodes_image, text_to_textnodes, markdown_to_blocks
+from textnode import TextNode, TextType, link_props, text_node_to_html_node, text_nodes_to_html, text_nodes_to_html_nodes
+from helpers import inline_to_html, type_to_delim, split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_link, split_nodes_image, text_to_textnodes, markdown_to_blocks, text_to_children, iter_markdown_blocks, split_nodes_link_and_image
+from blocks import iter_html_nodes
 
 
 class TestTextNode(unittest.TestCase):
@@ -15,6 +19,11 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is Bold", TextType.BOLD)
         self.assertNotEqual(node, node2)
     
+    def test_slots(self):
+        node = TextNode("This is a text node", TextType.BOLD)
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual(repr(node), "TextNode(This is a text node, TextType.BOLD, None)")
+
     def test_none(self):
         node = TextNode("No Url", TextType.LINK)
         self.assertEqual(node.url, None)
@@ -55,6 +64,45 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual(html_node.tag, "img")
         self.assertEqual(html_node.to_html(), "<img src=\"www.google.com\" alt=\"This is a text node\"></img>")
     
+    def test_batched_matches_per_node(self):
+        nodes = [
+            TextNode("a < b", TextType.TEXT),
+            TextNode("bold", TextType.BOLD),
+            TextNode("it", TextType.ITALIC),
+            TextNode("x & y", TextType.CODE),
+            TextNode("link", TextType.LINK, "/a?b=1&c=2"),
+            TextNode('say "hi"', TextType.IMAGE, "/img.png"),
+        ]
+        expected = [text_node_to_html_node(node).to_html() for node in nodes]
+        self.assertEqual([node.to_html() for node in text_nodes_to_html_nodes(nodes)], expected)
+        self.assertEqual(text_nodes_to_html(nodes), "".join(expected))
+
+    def test_batched_shares_props(self):
+        nodes = [TextNode("one", TextType.LINK, "/x"), TextNode("two", TextType.LINK, "/x")]
+        first, second = text_nodes_to_html_nodes(nodes)
+        self.assertIs(first.props, second.props)
+        with self.assertRaises(TypeError):
+            first.props["href"] = "/y"
+        self.assertEqual(pickle.loads(pickle.dumps(link_props("/x"))).html, ' href="/x"')
+
+    def test_link_without_url(self):
+        nodes = [TextNode("link", TextType.LINK), TextNode("img", TextType.IMAGE)]
+        expected = '<a href="None">link</a><img src="None" alt="img"></img>'
+        self.assertEqual("".join(text_node_to_html_node(node).to_html() for node in nodes), expected)
+        self.assertEqual("".join(node.to_html() for node in text_nodes_to_html_nodes(nodes)), expected)
+        self.assertEqual(text_nodes_to_html(nodes), expected)
+
+    def test_batched_invalid_type(self):
+        nodes = [TextNode("fine", TextType.TEXT), TextNode("bad", "Not a type")]
+        with self.assertRaises(Exception):
+            text_nodes_to_html_nodes(nodes)
+        with self.assertRaises(Exception):
+            text_nodes_to_html(nodes)
+
+    def test_inline_to_html_matches_children(self):
+        text = "A **bold [link](/a) & _more_** `<code>` and ![img](/i.png) _x_"
+        self.assertEqual(inline_to_html(text), "".join(child.to_html() for child in text_to_children(text)))
+
     def test_one_delim_middle(self):
         node = TextNode("We are testing **markdown** today", TextType.TEXT)
         new_node = split_nodes_delimiter([node], "**", TextType.BOLD)
@@ -175,6 +223,31 @@ class TestTextNode(unittest.TestCase):
             new_nodes,
         )
 
+    def test_split_link_next_to_same_image(self):
+        node = TextNode("![a](b) and [a](b)", TextType.TEXT)
+        self.assertListEqual(
+            [
+                TextNode("![a](b) and ", TextType.TEXT),
+                TextNode("a", TextType.LINK, "b"),
+            ],
+            split_nodes_link([node]),
+        )
+
+    def test_split_link_and_image(self):
+        node = TextNode("See [docs](/docs), ![logo](/logo.png) and [faq](/faq)", TextType.TEXT)
+        self.assertListEqual(
+            [
+                TextNode("See ", TextType.TEXT),
+                TextNode("docs", TextType.LINK, "/docs"),
+                TextNode(", ", TextType.TEXT),
+                TextNode("logo", TextType.IMAGE, "/logo.png"),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("faq", TextType.LINK, "/faq"),
+            ],
+            split_nodes_link_and_image([node]),
+        )
+        self.assertListEqual(split_nodes_image(split_nodes_link([node])), split_nodes_link_and_image([node]))
+
     def test_split_links(self):
         def test_text_to_textnodes_only_text(self):
             text = "Just plain text with no markdown."
@@ -334,5 +407,98 @@ This is the same paragraph on a new line
             ["Block one", "Block two", "Block three"]
         )
 
+    def chained_text_to_textnodes(self, text):
+        node_list = split_nodes_link([TextNode(text, TextType.TEXT)])
+        node_list = split_nodes_image(node_list)
+        node_list = split_nodes_delimiter(node_list, "`", TextType.CODE)
+        node_list = split_nodes_delimiter(node_list, "_", TextType.ITALIC)
+        node_list = split_nodes_delimiter(node_list, "**", TextType.BOLD)
+        return node_list
+
+    def test_text_to_textnodes_matches_chained_splitting(self):
+        texts = [
+            "This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)",
+            "[start](a) middle ![img](b) end",
+            "a****b and a__b and ``",
+            "***triple*** stars and a lone * star",
+            "![not an image] (x) and [not a link] (y) and !bang",
+            "`_not italic_` and `**not bold**`",
+            "Mixing _italic and **bold**_ styles.",
+            "[a _b_](u) then **c**",
+            "",
+        ]
+        for text in texts:
+            self.assertListEqual(self.chained_text_to_textnodes(text), text_to_textnodes(text))
+
+    def test_text_to_textnodes_same_errors(self):
+        for text in ["a **b", "a _b", "a `b", "_a `b_` c", "_a **b_ c**"]:
+            with self.assertRaises(ValueError):
+                self.chained_text_to_textnodes(text)
+            with self.assertRaises(ValueError):
+                text_to_textnodes(text)
+
+    def test_text_to_textnodes_bold_around_italic(self):
+        node_list = text_to_textnodes("**bold and _italic_** text")
+        self.assertListEqual(
+            [
+                TextNode("bold and _italic_", TextType.BOLD),
+                TextNode(" text", TextType.TEXT),
+            ],
+            node_list,
+        )
+
+    def test_text_to_children_nested(self):
+        children = text_to_children("Mixing _italic and **bold**_ styles.")
+        html = "".join(child.to_html() for child in children)
+        self.assertEqual(html, "Mixing <i>italic and <b>bold</b></i> styles.")
+
+    def test_text_to_children_code_in_bold(self):
+        children = text_to_children("**run `make` now** [docs](/docs)")
+        html = "".join(child.to_html() for child in children)
+        self.assertEqual(html, '<b>run <code>make</code> now</b> <a href="/docs">docs</a>')
+
+class TestStreamingBlocks(unittest.TestCase):
+    def test_iter_markdown_blocks_file(self):
+        md = "# Title\n\nFirst paragraph\nstill first\n\n\n- item\n- item\n"
+        blocks = list(iter_markdown_blocks(io.StringIO(md)))
+        self.assertEqual(blocks, markdown_to_blocks(md))
+        self.assertEqual(blocks, ["# Title", "First paragraph\nstill first", "- item\n- item"])
+
+    def test_iter_markdown_blocks_lines_without_newlines(self):
+        blocks = list(iter_markdown_blocks(["one", "two", "", "three"]))
+        self.assertEqual(blocks, ["one\ntwo", "three"])
+
+    def test_iter_markdown_blocks_is_lazy(self):
+        def lines():
+            yield "first block"
+            yield ""
+            raise AssertionError("read past the first block")
+        self.assertEqual(next(iter_markdown_blocks(lines())), "first block")
+
+    def test_iter_html_nodes(self):
+        nodes = list(iter_html_nodes(io.StringIO("Some **bold**\n\nA [link](/x)\n")))
+        self.assertEqual(
+            [node.to_html() for node in nodes],
+            ["<p>Some <b>bold</b></p>", '<p>A <a href="/x">link</a></p>'],
+        )
+
+    def peak_memory(self, block_count):
+        def lines():
+            for i in range(block_count):
+                yield f"Paragraph {i} with **bold**, _italic_ and a [link](/page/{i}).\n"
+                yield "\n"
+        tracemalloc.start()
+        for node in iter_html_nodes(lines()):
+            node.to_html()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+    def test_memory_stays_flat_as_input_grows(self):
+        small = self.peak_memory(500)
+        large = self.peak_memory(10000)
+        self.assertLess(large, small * 2)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
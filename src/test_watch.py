@@ -0,0 +1,90 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.request
+
+from watch import InotifyWatcher, PollingWatcher, make_watcher, serve, watch
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        os.makedirs(self.content)
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.template, "{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def check_watcher(self, watcher):
+        try:
+            self.assertEqual(watcher.wait(0.05), set())
+            page = os.path.join(self.content, "page.md")
+            self.write(page, "# Page")
+            self.assertIn(page, watcher.wait(2))
+            self.write(self.template, "<main>{{ Content }}</main>")
+            self.assertIn(self.template, watcher.wait(2))
+            self.write(os.path.join(self.tmp.name, "unrelated.txt"), "x")
+            self.assertEqual(watcher.wait(0.3), set())
+        finally:
+            watcher.close()
+
+    def test_polling_watcher(self):
+        self.check_watcher(PollingWatcher([self.content, self.template], interval=0.02))
+
+    def test_inotify_watcher(self):
+        try:
+            watcher = InotifyWatcher([self.content, self.template])
+        except (OSError, AttributeError, TypeError):
+            self.skipTest("inotify not available")
+        self.check_watcher(watcher)
+
+    def test_make_watcher_skips_missing_paths(self):
+        watcher = make_watcher([self.content, os.path.join(self.tmp.name, "static")], poll=True)
+        self.assertEqual(watcher.paths, [os.path.normpath(self.content)])
+
+    def test_watch_debounces_bursts(self):
+        watcher = PollingWatcher([self.content], interval=0.02)
+        stop = threading.Event()
+        rebuilds = []
+
+        def rebuild(changed):
+            rebuilds.append(changed)
+            stop.set()
+
+        thread = threading.Thread(target=watch, args=(watcher, rebuild, 0.3, stop))
+        thread.start()
+        for i in range(3):
+            self.write(os.path.join(self.content, f"page{i}.md"), "# Page")
+            time.sleep(0.05)
+        thread.join(5)
+        self.assertEqual(len(rebuilds), 1)
+        self.assertEqual(len(rebuilds[0]), 3)
+
+    def test_serve_injects_live_reload(self):
+        self.write(os.path.join(self.tmp.name, "index.html"), "<html><body>hi</body></html>")
+        server = serve(self.tmp.name, port=0)
+        try:
+            base = f"http://127.0.0.1:{server.server_address[1]}"
+            with urllib.request.urlopen(base + "/") as response:
+                body = response.read().decode()
+            self.assertIn("hi", body)
+            self.assertIn("/__livereload", body)
+            server.state.generation += 1
+            with urllib.request.urlopen(base + "/__livereload") as response:
+                self.assertEqual(response.read(), b"1")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 from enum import Enum
-from htmlnode import LeafNode
+from functools import lru_cache
+from htmlnode import FrozenProps, LeafNode, escape_text
 
 class TextType(Enum):
     TEXT = "Normal Text"
@@ -11,6 +12,8 @@ class TextType(Enum):
 
 
 class TextNode():
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url = None):
         self.text = text
         self.text_type = text_type
@@ -41,3 +44,86 @@ def text_node_to_html_node(text_node):
             return LeafNode("img", "", {"src":text_node.url, "alt":text_node.text})
         case default:
             raise Exception("Invalid TextType")
+
+
+# Props are interned per URL (and alt text for images): repeated links share
+# one FrozenProps whose attribute string is serialized once. The caches are
+# small so streaming a site with many distinct URLs stays flat in memory.
+@lru_cache(maxsize=256)
+def link_props(url):
+    return FrozenProps(href=url)
+
+@lru_cache(maxsize=256)
+def image_props(url, alt):
+    return FrozenProps(src=url, alt=alt)
+
+def text_leaf(text, url):
+    return LeafNode(None, text)
+
+def bold_leaf(text, url):
+    return LeafNode("b", text)
+
+def italic_leaf(text, url):
+    return LeafNode("i", text)
+
+def code_leaf(text, url):
+    return LeafNode("code", text)
+
+def link_leaf(text, url):
+    return LeafNode("a", text, link_props(url))
+
+def image_leaf(text, url):
+    return LeafNode("img", "", image_props(url, text))
+
+def text_html(text, url):
+    return escape_text(text)
+
+def bold_html(text, url):
+    return f"<b>{escape_text(text)}</b>"
+
+def italic_html(text, url):
+    return f"<i>{escape_text(text)}</i>"
+
+def code_html(text, url):
+    return f"<code>{escape_text(text)}</code>"
+
+def link_html(text, url):
+    return f"<a{link_props(url).html}>{escape_text(text)}</a>"
+
+def image_html(text, url):
+    return f"<img{image_props(url, text).html}></img>"
+
+# Per-TextType dispatch: (text, url) -> LeafNode, and (text, url) -> the
+# HTML that LeafNode would render, built without the node.
+LEAF_BUILDERS = {
+    TextType.TEXT: text_leaf,
+    TextType.BOLD: bold_leaf,
+    TextType.ITALIC: italic_leaf,
+    TextType.CODE: code_leaf,
+    TextType.LINK: link_leaf,
+    TextType.IMAGE: image_leaf,
+}
+HTML_BUILDERS = {
+    TextType.TEXT: text_html,
+    TextType.BOLD: bold_html,
+    TextType.ITALIC: italic_html,
+    TextType.CODE: code_html,
+    TextType.LINK: link_html,
+    TextType.IMAGE: image_html,
+}
+
+def text_nodes_to_html_nodes(text_nodes):
+    # Batched text_node_to_html_node: one table lookup per node instead of
+    # a match, with shared props for links and images.
+    try:
+        return [LEAF_BUILDERS[node.text_type](node.text, node.url) for node in text_nodes]
+    except KeyError:
+        raise Exception("Invalid TextType")
+
+def text_nodes_to_html(text_nodes):
+    # Same output as joining text_nodes_to_html_nodes(...).to_html(), with
+    # no intermediate LeafNodes.
+    try:
+        return "".join([HTML_BUILDERS[node.text_type](node.text, node.url) for node in text_nodes])
+    except KeyError:
+        raise Exception("Invalid TextType")
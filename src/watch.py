@@ -0,0 +1,217 @@
+import ctypes
+import ctypes.util
+import functools
+import os
+import select
+import struct
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_SCRIPT = b"""<script>
+(function () {
+  var generation = null;
+  setInterval(function () {
+    fetch("/__livereload").then(function (r) { return r.text(); }).then(function (g) {
+      if (generation !== null && g !== generation) { location.reload(); }
+      generation = g;
+    }).catch(function () {});
+  }, 1000);
+})();
+</script>"""
+
+
+def is_watched(path, paths):
+    for watched in paths:
+        if path == watched or path.startswith(watched.rstrip(os.sep) + os.sep):
+            return True
+    return False
+
+
+def snapshot(paths):
+    files = {}
+    for watched in paths:
+        if os.path.isfile(watched):
+            stat = os.stat(watched)
+            files[watched] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        for root, dirs, names in os.walk(watched):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+class PollingWatcher():
+    def __init__(self, paths, interval=0.25):
+        self.paths = [os.path.normpath(path) for path in paths]
+        self.interval = interval
+        self.files = snapshot(self.paths)
+
+    def wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            current = snapshot(self.paths)
+            changed = {
+                path for path in current.keys() | self.files.keys()
+                if current.get(path) != self.files.get(path)
+            }
+            self.files = current
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher():
+    def __init__(self, paths):
+        self.paths = [os.path.normpath(path) for path in paths]
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+        for watched in self.paths:
+            if os.path.isdir(watched):
+                for root, dirs, names in os.walk(watched):
+                    self.add_dir(root)
+            else:
+                self.add_dir(os.path.dirname(watched) or ".")
+
+    def add_dir(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self.dirs[wd] = path
+
+    def read_events(self):
+        changed = set()
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if wd not in self.dirs or not name:
+                continue
+            path = os.path.join(self.dirs[wd], name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and is_watched(path, self.paths):
+                    for root, dirs, names in os.walk(path):
+                        self.add_dir(root)
+                        changed.update(os.path.join(root, n) for n in names)
+                continue
+            if is_watched(path, self.paths):
+                changed.add(path)
+        return changed
+
+    def wait(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        return self.read_events()
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(paths, poll=False):
+    paths = [path for path in paths if os.path.exists(path)]
+    if not poll:
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError, TypeError):
+            pass
+    return PollingWatcher(paths)
+
+
+def watch(watcher, rebuild, debounce=0.1, stop=None):
+    # Blocks until stop is set. A burst of saves is collected until the
+    # watcher stays quiet for `debounce` seconds, then rebuilt once.
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        changed = watcher.wait(0.5)
+        if not changed:
+            continue
+        while True:
+            more = watcher.wait(debounce)
+            if not more:
+                break
+            changed |= more
+        rebuild(changed)
+
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, server_state=None, **kwargs):
+        self.server_state = server_state
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path == LIVE_RELOAD_PATH:
+            self.send_bytes(str(self.server_state.generation).encode(), "text/plain")
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if not self.server_state.live_reload or not path.endswith(".html") or not os.path.isfile(path):
+            super().do_GET()
+            return
+        with open(path, "rb") as f:
+            body = f.read()
+        if b"</body>" in body:
+            body = body.replace(b"</body>", LIVE_RELOAD_SCRIPT + b"</body>", 1)
+        else:
+            body += LIVE_RELOAD_SCRIPT
+        self.send_bytes(body, "text/html; charset=utf-8")
+
+    def send_bytes(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ServerState():
+    def __init__(self, live_reload=True):
+        self.live_reload = live_reload
+        self.generation = 0
+
+
+def serve(directory, port=8888, live_reload=True):
+    # Serves `directory` from a background thread and returns the server;
+    # bump server.state.generation after a rebuild to reload open pages.
+    state = ServerState(live_reload)
+    handler = functools.partial(LiveReloadHandler, directory=directory, server_state=state)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.state = state
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server